@@ -0,0 +1,144 @@
+# BOM 처리 단계별 성능 측정 (가상 ECO_BOM, 화면 없이 offscreen Qt 로 실행)
+#
+#   python bench_bom.py -o bench_results.csv --rows 1000 10000 100000 500000 --depths 3 6 --fanouts 5 20
+#
+# 단계 (rpa_bom_0507.myWindow 의 동작과 대응)
+#   load      : loadData                      - EcoWorkbook(on_chunk=...) 청크 스트리밍 (캐시 없이, 화면과 같은 경로)
+#   load_full : 청크 없이 한 번에 읽기          - EcoWorkbook (캐시 없이, batch / CLI 경로)
+#   tree      : create_tree                   - BomGraph.from_dataframe
+#   tree_view : Tree 모델 교체 + 펼치기       - myWindow.on_tree_built (Qt)
+#   rename    : change_node_name              - 가장 깊은 품번 변경 + 상위 첨자
+#   to_frame  : Transform 의 tree_to_dataframe
+#   compare   : on_transform_button_clicked   - DataFrameDialog.compare (+ show_comparison, Qt)
+#   save      : save_dataframe_to_excel       - write_bom_xlsx
+# 결과는 CSV (rows, depth, fanout, repeat, stage, seconds), 이전 결과와 비교해 느려진 단계를 찾는 용도.
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from bom_engine import BomGraph, EcoLog, bump_revision, change_node_name
+from bom_engine.export import tree_to_dataframe, write_bom_xlsx
+from bom_engine.loader import EcoWorkbook
+from bom_engine.synth import synthetic_bom, write_eco_workbook
+
+RESULT_FIELDS = ["rows", "depth", "fanout", "repeat", "stage", "seconds"]
+STAGES = ["load", "load_full", "tree", "tree_view", "rename", "to_frame", "compare", "save"]
+
+
+def load_gui():
+    # PySide6 / 화면 모듈을 쓸 수 없으면 Qt 단계는 건너뛴다
+    try:
+        from PySide6.QtWidgets import QApplication
+        import rpa_bom_0507
+    except ImportError as e:
+        print("Qt 단계 건너뜀: %s" % e, file=sys.stderr)
+        return None
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    return app, rpa_bom_0507
+
+
+def run_case(path, gui, timings):
+    # 한 번 실행하며 단계별 시간을 timings[stage] 에 기록
+    def timed(stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    workbook = timed("load", lambda: EcoWorkbook(path, on_chunk=lambda chunk: None))
+    timed("load_full", EcoWorkbook, path)
+    old_df = workbook.eco_bom
+    graph = timed("tree", BomGraph.from_dataframe, old_df)
+
+    window = None
+    if gui is not None:
+        app, module = gui
+        window = module.myWindow()
+        window.workbook = workbook
+        timed("tree_view", window.on_tree_built, graph)
+        app.processEvents()
+
+    deepest = old_df["ITM"].iloc[int(old_df["LVL"].astype(int).to_numpy().argmax())]
+    timed("rename", change_node_name, graph, str(deepest), bump_revision(str(deepest)), EcoLog())
+    new_df = timed("to_frame", tree_to_dataframe, graph)
+
+    if window is not None:
+        def compare():
+            dialog = module.DataFrameDialog(window)
+            dialog.show_comparison(module.DataFrameDialog.compare(old_df, new_df))
+            app.processEvents()
+            dialog.deleteLater()
+        timed("compare", compare)
+        window.deleteLater()
+        app.processEvents()
+    else:
+        from bom_engine import diff
+        timed("compare", lambda: diff.align(diff.diff_boms(old_df, new_df)))
+
+    out_path = os.path.splitext(path)[0] + "_NEW.xlsx"
+    timed("save", write_bom_xlsx, new_df, out_path)
+    os.remove(out_path)
+
+
+def run(sizes, depths, fanouts, repeat, out_path, gui=True, work_dir=None, shared_ratio=0.0):
+    gui = load_gui() if gui else None
+    temp_dir = work_dir or tempfile.mkdtemp(prefix="bom_bench_")
+    os.makedirs(temp_dir, exist_ok=True)
+    results = []
+    try:
+        with open(out_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            for rows in sizes:
+                for depth in depths:
+                    for fanout in fanouts:
+                        path = os.path.join(temp_dir, "synthetic_%d_%d_%d.xlsx" % (rows, depth, fanout))
+                        write_eco_workbook(synthetic_bom(rows, depth, fanout, shared_ratio=shared_ratio), path)
+                        for r in range(repeat):
+                            timings = {}
+                            run_case(path, gui, timings)
+                            for stage in STAGES:
+                                if stage in timings:
+                                    result = dict(rows=rows, depth=depth, fanout=fanout, repeat=r,
+                                                  stage=stage, seconds=round(timings[stage], 4))
+                                    writer.writerow(result)
+                                    results.append(result)
+                            f.flush()
+                            print("%7d rows depth %d fanout %2d #%d  %s" % (
+                                rows, depth, fanout, r,
+                                "  ".join("%s %.2fs" % (s, timings[s]) for s in STAGES if s in timings)))
+                        if work_dir is None:
+                            os.remove(path)
+    finally:
+        if work_dir is None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BOM 처리 단계별 성능 측정 (가상 ECO_BOM)")
+    parser.add_argument("-o", "--output", default="bench_results.csv", help="결과 CSV 파일")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000, 500000], help="BOM 행 수")
+    parser.add_argument("--depths", type=int, nargs="+", default=[3, 6], help="BOM 깊이 (LVL)")
+    parser.add_argument("--fanouts", type=int, nargs="+", default=[5, 20], help="SUB ASSY 하위 품번 수")
+    parser.add_argument("--shared", type=float, default=0.0, help="공용 SUB ASSY 비율 (bom_engine.synth)")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="같은 BOM 반복 측정 횟수")
+    parser.add_argument("--no-gui", action="store_true", help="Qt 단계 없이 bom_engine 만 측정")
+    parser.add_argument("--work-dir", default=None, help="가상 엑셀 파일을 남겨 둘 폴더 (기본: 임시 폴더, 끝나면 삭제)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    run(args.rows, args.depths, args.fanouts, args.repeat, args.output, not args.no_gui, args.work_dir,
+        args.shared)
+    print("%.1fs -> %s" % (time.perf_counter() - start, args.output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
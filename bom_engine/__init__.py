@@ -0,0 +1,12 @@
+# BOM 엔진 (Qt 없이 사용 가능)
+# pandas 가 필요한 loader / export 는 서브모듈에서 직접 import 한다.
+#   from bom_engine.loader import EcoWorkbook, read_eco_bom
+#   from bom_engine.export import tree_to_dataframe
+#   from bom_engine.validate import validate_bom
+#   from bom_engine.rollup import rollup_quantities, rollup_table
+from .traverse import BomCycleError, walk, ancestors
+from .graph import BomGraph, BomBuilder, STATUS_UNCHANGED, STATUS_ADDED, STATUS_CHANGED, STATUS_DELETED
+from .revision import RevisionError, bump_revision, bump_series
+from .eco import (EcoLog, increment_last_alpha, find_nodes_by_name,
+                  change_node_name, change_node_and_ancestors, apply_renames, bump_revisions,
+                  add_part, mark_deleted)
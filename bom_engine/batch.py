@@ -0,0 +1,122 @@
+# 여러 ECO_BOM 엑셀 파일에 설변 목록(change spec)을 한 번에 적용
+#
+#   python -m bom_engine <입력 폴더> <spec.json> -o <출력 폴더> [-j 프로세스 수]
+#
+# spec.json 형식
+#   {
+#     "renames":   {"기존 품번": "신규 품번", ...},
+#     "additions": [{"parent": "상위 품번", "after": "형제 품번(선택)",
+#                    "ITM": "...", "PREFIX": "...", "ITM_DESC": "...", "QTY": "...", "UOM": "..."}],
+#     "deletions": ["삭제 품번", ...]
+#   }
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .eco import EcoLog, add_part, apply_renames, mark_deleted
+from .graph import BomGraph
+
+SPEC_KEYS = ("renames", "additions", "deletions")
+ADD_COLUMNS = ["ITM", "PREFIX", "ITM_DESC", "QTY", "UOM", "SRC", "PROC", "THREAD"]
+SUMMARY_FIELDS = ["file", "output", "status", "rows", "renamed", "added", "deleted", "seconds", "message"]
+
+
+def load_spec(path):
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    unknown = set(spec) - set(SPEC_KEYS)
+    if unknown:
+        raise ValueError("알 수 없는 spec 항목: %s" % ", ".join(sorted(unknown)))
+    for addition in spec.get("additions", []):
+        if "parent" not in addition or "ITM" not in addition:
+            raise ValueError("additions 항목에는 parent 와 ITM 이 필요합니다: %r" % addition)
+    return {key: spec.get(key, {} if key == "renames" else []) for key in SPEC_KEYS}
+
+
+def apply_spec(graph, spec, log=None):
+    if log is None:
+        log = EcoLog()
+    renamed = added = deleted = 0
+
+    # spec 의 품번은 모두 원래 BOM 기준 -> 추가/삭제 먼저, 첨자가 바뀌는 변경은 마지막
+    for addition in spec["additions"]:
+        values = [str(addition.get(column, '')) for column in ADD_COLUMNS]
+        added += len(add_part(graph, addition["parent"], values, addition.get("after"), log))
+    for name in spec["deletions"]:
+        deleted += len(mark_deleted(graph, name, log))
+    renames = spec["renames"]
+    renamed = sum(1 for old_name in renames if graph.find(old_name))
+    apply_renames(graph, renames, log)
+    return renamed, added, deleted
+
+
+def process_workbook(path, spec, out_dir):
+    # 프로세스 풀에서 실행 (pandas 는 여기서 import)
+    from .export import tree_to_dataframe, write_bom_xlsx
+    from .loader import read_eco_bom
+
+    start = time.perf_counter()
+    result = dict.fromkeys(SUMMARY_FIELDS, '')
+    result["file"] = path
+    try:
+        graph = BomGraph.from_dataframe(read_eco_bom(path))
+        log = EcoLog()
+        result["renamed"], result["added"], result["deleted"] = apply_spec(graph, spec, log)
+
+        df = tree_to_dataframe(graph)
+        out_path = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + "_NEW.xlsx")
+        write_bom_xlsx(df, out_path)
+
+        result.update(output=out_path, status="ok", rows=len(df), message="; ".join(log.errors))
+    except Exception as e:
+        result.update(status="error", message="%s: %s" % (type(e).__name__, e))
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run(paths, spec, out_dir, jobs=None):
+    os.makedirs(out_dir, exist_ok=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(process_workbook, path, spec, out_dir) for path in paths]
+        for future in as_completed(futures):
+            result = future.result()
+            print("[%s] %s (%.1fs)" % (result["status"], result["file"], result["seconds"]))
+            results.append(result)
+
+    results.sort(key=lambda r: r["file"])
+    with open(os.path.join(out_dir, "summary.csv"), "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bom_engine",
+                                     description="ECO_BOM 엑셀 파일 일괄 설변 적용")
+    parser.add_argument("input_dir", help="ECO_BOM 엑셀 파일 폴더")
+    parser.add_argument("spec", help="설변 목록 (JSON)")
+    parser.add_argument("-o", "--output-dir", required=True, help="결과 엑셀 / summary.csv 저장 폴더")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--pattern", default="*.xlsx", help="입력 파일 패턴 (기본: *.xlsx)")
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    paths = sorted(p for p in glob.glob(os.path.join(args.input_dir, args.pattern))
+                   if not os.path.basename(p).startswith("~$"))  # 엑셀 임시 파일 제외
+    if not paths:
+        print("입력 파일이 없습니다:", os.path.join(args.input_dir, args.pattern), file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    results = run(paths, spec, args.output_dir, args.jobs)
+    failed = sum(r["status"] != "ok" for r in results)
+    print("%d files, %d failed, %.1fs" % (len(results), failed, time.perf_counter() - start))
+    return 1 if failed else 0
@@ -0,0 +1,119 @@
+# 정리된 ECO_BOM DataFrame 디스크 캐시
+# 같은 엑셀 파일을 다시 열 때 XLSX 파싱 대신 Feather 파일을 memory-map 으로 읽는다.
+#   키   : 파일 경로 + 크기 + 수정 시각 + 내용 해시
+#   정리 : 전체 용량이 max_bytes 를 넘으면 가장 오래 안 쓴 항목부터 삭제 (LRU)
+import hashlib
+import os
+import pickle
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:     # pyarrow 가 없으면 pickle 로 저장
+    pa = feather = None
+
+DEFAULT_CACHE_DIR = os.environ.get("BOM_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".bom_cache"))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CACHE_VERSION = 3       # 저장 형식이나 ECO_BOM 정리 규칙이 바뀌면 올린다
+
+
+def file_digest(file_name, chunk_size=1024 * 1024):
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_name, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class BomCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, file_name):
+        st = os.stat(file_name)
+        source = "%d|%s|%d|%d|%s" % (CACHE_VERSION, os.path.abspath(file_name), st.st_size,
+                                     st.st_mtime_ns, file_digest(file_name))
+        return hashlib.blake2b(source.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".feather", base + ".pkl"
+
+    def get(self, key):
+        for path in self._paths(key):
+            if os.path.exists(path):
+                try:
+                    df = self._read(path)
+                except Exception:   # 깨진 캐시 파일은 지우고 다시 읽는다
+                    self._remove(path)
+                    return None
+                os.utime(path)      # LRU 기준 시각 갱신
+                return df
+        return None
+
+    def put(self, key, df):
+        # 캐시 폴더를 만들 수 없거나 쓸 수 없으면 캐시 없이 진행
+        feather_path, pickle_path = self._paths(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._write(feather_path, pickle_path, df)
+        except OSError:
+            return
+        self.evict()
+
+    def load(self, file_name, reader):
+        # 캐시에 있으면 바로 반환, 없으면 reader(file_name) 결과를 저장
+        key = self.key(file_name)
+        df = self.get(key)
+        if df is None:
+            df = reader(file_name)
+            self.put(key, df)
+        return df
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith((".feather", ".pkl")):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith((".feather", ".pkl")):
+                    self._remove(entry.path)
+
+    def _read(self, path):
+        if path.endswith(".feather"):
+            return feather.read_table(path, memory_map=True).to_pandas()
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def _write(self, feather_path, pickle_path, df):
+        if feather is not None:
+            tmp = feather_path + ".tmp"
+            try:
+                feather.write_feather(df, tmp, compression="uncompressed")
+            except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError):
+                # 숫자/문자가 섞인 컬럼은 Arrow 로 저장할 수 없음 -> pickle
+                self._remove(tmp)
+            else:
+                os.replace(tmp, feather_path)
+                return
+        tmp = pickle_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, pickle_path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
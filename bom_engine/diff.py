@@ -0,0 +1,205 @@
+# OLD / NEW BOM 비교
+# (PARENT, ITM, PREFIX) 키로 행을 해시 조인하고 각 행을 분류한다.
+#   same    : 그대로 (PARENT 의 첨자만 바뀐 행 포함)
+#   changed : 값(ITM_DESC, QTY, ...)이 바뀌었거나 같은 자리의 ITM 첨자가 바뀜
+#   moved   : 다른 PARENT 로 이동했거나 순서가 바뀜 (LIS 로 최소 이동만 표시)
+#   added   : NEW 에만 있음
+#   removed : OLD 에만 있음
+# 같은 키가 여러 번 나오면 나오는 순서대로 짝을 짓는다. 전체 O(n log n).
+# 조인과 값 비교는 양쪽 공통 번호표로 바꾼 정수 코드로 하고, 문자열은 결과를 만들 때만 꺼낸다.
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+from .revision import split_revision
+from .trace import traced
+
+KEY = ["PARENT", "ITM", "PREFIX"]
+REVISION_KEY = ["PARENT", "ITM"]     # 첨자를 뗀 본체로 다시 짝짓는 키 컬럼
+SAME, CHANGED, MOVED, ADDED, REMOVED = "same", "changed", "moved", "added", "removed"
+DIFF_COLUMNS = ["KIND", "OLD_ROW", "NEW_ROW"] + KEY + ["CHANGES"]
+
+
+@traced("diff_boms")
+def diff_boms(old_df, new_df, key=KEY):
+    fields = [c for c in old_df.columns if c in new_df.columns and c not in key and c != "STATUS"]
+    old, new, labels = _prepare(old_df, new_df, key + fields)
+    old = {c: old[c].to_numpy() for c in old.columns}
+    new = {c: new[c].to_numpy() for c in new.columns}
+
+    # 1) 키 + 순번으로 해시 조인
+    on = key + ["_OCC"]
+    merged = pd.DataFrame({c: old[c] for c in on + ["_ROW"]}).merge(
+        pd.DataFrame({c: new[c] for c in on + ["_ROW"]}), on=on, how="outer", suffixes=("_OLD", "_NEW"), sort=False)
+    old_row = merged["_ROW_OLD"].fillna(-1).to_numpy(dtype=np.int64)
+    new_row = merged["_ROW_NEW"].fillna(-1).to_numpy(dtype=np.int64)
+
+    # 2) 품번 변경 + 상위 첨자 올림: 남은 REMOVED / ADDED 를 첨자를 뗀 PARENT, ITM 과 PREFIX 로 짝지어
+    #    같은 자리의 행으로 본다 (ITM 첨자가 바뀌었으면 CHANGED, PARENT 첨자만 바뀌었으면 SAME)
+    if (old_row < 0).any() and (new_row < 0).any():
+        bases = {c: _revision_base(labels[c]) for c in REVISION_KEY if c in key}
+        old_row, new_row, _, _ = _pair_rows(old_row, new_row,
+                                            [bases[c][old[c]] if c in bases else old[c] for c in key],
+                                            [bases[c][new[c]] if c in bases else new[c] for c in key])
+
+    # 3) 순서 변경: OLD 순서로 봤을 때 NEW 위치의 최장 증가 부분수열 밖에 있는 행
+    matched = np.flatnonzero((old_row >= 0) & (new_row >= 0))
+    matched = matched[np.argsort(old_row[matched], kind="stable")]
+    reordered = np.zeros(len(old_row), dtype=bool)
+    reordered[matched[~_lis_mask(new_row[matched])]] = True
+
+    # 4) PARENT 가 바뀐 행: 남은 REMOVED / ADDED 를 (ITM, PREFIX) 로 짝지어 MOVED 로
+    pair_key = [c for c in key if c != "PARENT"]
+    old_row, new_row, reparented, keep = _pair_rows(old_row, new_row, [old[c] for c in pair_key],
+                                                    [new[c] for c in pair_key])
+    reordered = reordered[keep]
+
+    both = (old_row >= 0) & (new_row >= 0)
+    kinds = np.where(both, SAME, np.where(old_row >= 0, REMOVED, ADDED)).astype(object)
+    changes = np.full(len(old_row), "", dtype=object)
+
+    # 5) 값 비교 (컬럼 단위). PARENT 는 다른 상위로 옮긴 행만 (첨자만 바뀐 상위는 변경 아님)
+    idx = np.flatnonzero(both)
+    for c in key + fields:
+        a = old[c][old_row[idx]]
+        b = new[c][new_row[idx]]
+        diff = a != b
+        if c == "PARENT":
+            diff &= reparented[idx]
+        if not diff.any():
+            continue
+        rows = idx[diff]
+        changes[rows] = changes[rows] + ["%s: %s -> %s; " % (c, u, v)
+                                         for u, v in zip(labels[c][a[diff]], labels[c][b[diff]])]
+        if c != "PARENT":
+            kinds[rows] = CHANGED
+    changes[reordered] = changes[reordered] + "순서 변경; "
+    kinds[reordered | reparented] = MOVED
+
+    # 키는 NEW 쪽 값 (REMOVED 행만 OLD)
+    result = pd.DataFrame({"KIND": kinds, "OLD_ROW": old_row, "NEW_ROW": new_row})
+    for c in key:
+        codes = np.where(new_row >= 0, new[c][new_row.clip(0)], old[c][old_row.clip(0)])
+        result[c] = labels[c][codes]
+    result["CHANGES"] = changes
+    result["CHANGES"] = result["CHANGES"].str.rstrip("; ")
+    return result[DIFF_COLUMNS]
+
+
+@traced("align")
+def align(diff):
+    # 화면 표시용 정렬: NEW 순서 기준, REMOVED 행은 OLD 에서 바로 앞에 있던 행 뒤에 끼운다.
+    # 반환: (old_idx, new_idx, kinds) - 없는 쪽은 -1
+    old_row = diff["OLD_ROW"].to_numpy()
+    new_row = diff["NEW_ROW"].to_numpy()
+    n_old = int(old_row.max()) + 1 if len(old_row) else 0
+
+    new_of_old = np.full(n_old, -1, dtype=np.int64)
+    present = (old_row >= 0) & (new_row >= 0)
+    new_of_old[old_row[present]] = new_row[present]
+    # OLD 순서로 직전 매칭 행의 NEW 위치 (forward fill)
+    anchor = pd.Series(np.where(new_of_old >= 0, new_of_old, np.nan)).ffill().fillna(-1).to_numpy(dtype=np.int64)
+
+    removed = new_row < 0
+    primary = np.where(removed, anchor[old_row.clip(0)] if n_old else -1, new_row)
+    secondary = np.where(removed, 1, 0)
+    order = np.lexsort((old_row, secondary, primary))
+    return old_row[order], new_row[order], diff["KIND"].to_numpy()[order]
+
+
+@traced("aligned_frame")
+def aligned_frame(df, idx):
+    # align() 결과 행 번호로 DataFrame 을 다시 만든다 (-1 은 빈 행)
+    take = idx.clip(0)
+    missing = idx < 0
+    columns = {}
+    for c in df.columns:
+        values = df[c].to_numpy(dtype=object)
+        arr = values[take] if len(values) else np.full(len(idx), "", dtype=object)
+        arr[missing] = ""
+        columns[c] = arr
+    return pd.DataFrame(columns, columns=df.columns)
+
+
+def summary(diff):
+    return diff["KIND"].value_counts().to_dict()
+
+
+def _prepare(old_df, new_df, columns):
+    # 컬럼마다 OLD + NEW 값을 한 번에 factorize -> 양쪽이 같은 코드를 쓰는 정수 컬럼, labels[c][코드] = 문자열
+    old, new, labels = {}, {}, {}
+    for c in columns:
+        a = old_df[c].astype(str).to_numpy(dtype=object)
+        b = new_df[c].astype(str).to_numpy(dtype=object)
+        codes, uniques = pd.factorize(np.concatenate([a, b]))
+        old[c], new[c] = codes[:len(a)], codes[len(a):]
+        labels[c] = np.asarray(uniques, dtype=object)
+    key = [c for c in KEY if c in columns]
+    frames = []
+    for codes in (old, new):
+        out = pd.DataFrame(codes, columns=columns)
+        out["_OCC"] = out.groupby(key, sort=False).cumcount()
+        out["_ROW"] = np.arange(len(out))
+        frames.append(out)
+    return frames[0], frames[1], labels
+
+
+def _lis_mask(seq):
+    # 최장 증가 부분수열에 속하는 위치 True (patience sorting, O(n log n))
+    n = len(seq)
+    tails, tails_idx = [], []
+    prev = np.full(n, -1, dtype=np.int64)
+    for i, x in enumerate(seq.tolist()):
+        j = bisect_left(tails, x)
+        if j == len(tails):
+            tails.append(x)
+            tails_idx.append(i)
+        else:
+            tails[j] = x
+            tails_idx[j] = i
+        prev[i] = tails_idx[j - 1] if j > 0 else -1
+    mask = np.zeros(n, dtype=bool)
+    i = tails_idx[-1] if tails_idx else -1
+    while i >= 0:
+        mask[i] = True
+        i = prev[i]
+    return mask
+
+
+def _pair_rows(old_row, new_row, old_keys, new_keys):
+    # 짝이 없는 OLD 행(new_row < 0)과 NEW 행(old_row < 0)을 키 코드 배열 + 순번으로 짝짓는다.
+    # 짝지은 NEW 쪽 항목은 OLD 쪽 항목에 합친다.
+    # 반환: (old_row, new_row, 이번에 짝지은 항목 True, 원래 배열에서 남긴 항목 True)
+    lone_old = np.flatnonzero(new_row < 0)
+    lone_new = np.flatnonzero(old_row < 0)
+    keep = np.ones(len(old_row), dtype=bool)
+    paired = np.zeros(len(old_row), dtype=bool)
+    if not len(lone_old) or not len(lone_new):
+        return old_row, new_row, paired, keep
+
+    columns = ["_K%d" % i for i in range(len(old_keys))]
+
+    def frame(lone, rows, keys):
+        f = pd.DataFrame({c: k[rows] for c, k in zip(columns, keys)})
+        f["_OCC"] = f.groupby(columns, sort=False).cumcount()
+        f["_IDX"] = lone
+        return f
+
+    pairs = frame(lone_old, old_row[lone_old], old_keys).merge(
+        frame(lone_new, new_row[lone_new], new_keys), on=columns + ["_OCC"], suffixes=("_O", "_N"))
+    if pairs.empty:
+        return old_row, new_row, paired, keep
+    oi = pairs["_IDX_O"].to_numpy()
+    ni = pairs["_IDX_N"].to_numpy()
+    new_row = new_row.copy()
+    new_row[oi] = new_row[ni]
+    paired[oi] = True
+    keep[ni] = False
+    return old_row[keep], new_row[keep], paired[keep], keep
+
+
+def _revision_base(labels):
+    # labels 코드 -> 첨자를 뗀 품번(split_revision 의 family, 본체, 뒤 부분) 코드
+    bases = ["%s|%s|%s" % (family, base, tail) for family, base, _, tail in map(split_revision, labels)]
+    return pd.factorize(np.asarray(bases, dtype=object))[0]
@@ -0,0 +1,122 @@
+# 설변(ECO) 작업: 첨자 올리기, 품번 변경
+from .graph import STATUS_ADDED, STATUS_CHANGED, STATUS_DELETED
+from .revision import RevisionError, bump_revision
+from .trace import traced
+
+# 첨자를 올리지 않는 품번
+NO_BUMP_PARTS = ('620203-', '620205-')
+
+
+class EcoLog:
+    # 변경 내역 (GUI 의 old_names / updated_names, 배치 요약에 사용)
+    def __init__(self):
+        self.changes = []   # (nid, old_name, new_name)
+        self.errors = []
+        self.bumped = set() # 첨자를 이미 올린 노드 (같은 설변에서 두 번 올리지 않음)
+        self.statuses = []  # (nid, 바뀌기 전 status) - 되돌리기용
+
+    @property
+    def old_names(self):
+        return [old for _, old, _ in self.changes]
+
+    @property
+    def updated_names(self):
+        return [new for _, _, new in self.changes]
+
+    @property
+    def nodes(self):
+        return [nid for nid, _, _ in self.changes]
+
+
+def increment_last_alpha(s):
+    # 첨자 규칙은 revision 모듈 (I, O 건너뜀, -M 소재 품번, S / R 품번)
+    return bump_revision(s)
+
+
+def find_nodes_by_name(graph, name):
+    return graph.find(name)
+
+
+def change_node_name(graph, old_name, new_name, log=None):
+    return apply_renames(graph, {old_name: new_name}, log)
+
+
+@traced("apply_renames")
+def apply_renames(graph, mapping, log=None):
+    # {기존 품번: 신규 품번} 을 한 번에 적용
+    # 1) 대상 노드를 먼저 모두 찾고 (A->B, B->C 가 연쇄되지 않도록)
+    # 2) 품번 변경
+    # 3) 영향 받는 상위 노드를 모아 첨자는 노드마다 1 번만 올린다
+    if log is None:
+        log = EcoLog()
+
+    targets = [(nid, old_name, new_name) for old_name, new_name in mapping.items()
+               for nid in find_nodes_by_name(graph, old_name)]
+    for nid, old_name, new_name in targets:
+        graph.set_value(nid, 0, new_name)
+        log.statuses.append((nid, graph.status[nid]))
+        graph.status[nid] = STATUS_CHANGED
+        log.changes.append((nid, old_name, new_name))
+        log.bumped.add(nid)     # 직접 바꾼 품번은 첨자를 또 올리지 않음
+
+    bump_revisions(graph, [graph.parent[nid] for nid, _, _ in targets], log)
+    return log
+
+
+def bump_revisions(graph, nodes, log):
+    # nodes 와 그 상위 노드 전체의 첨자를 노드마다 1 번씩 올린다.
+    # 이미 올린 노드(log.bumped)를 만나면 그 위는 이미 모았으므로 멈춘다 -> 전체 O(노드 수)
+    parent = graph.parent
+    pending = []
+    for node in nodes:
+        while node >= 0 and node not in log.bumped:
+            log.bumped.add(node)
+            pending.append(node)
+            node = parent[node]
+
+    for node in pending:
+        old_name = graph.value(node, 0)
+        try:
+            new_name = increment_last_alpha(old_name)
+        except RevisionError as e:
+            log.errors.append(str(e))
+            new_name = old_name
+        log.changes.append((node, old_name, new_name))
+
+        if not any(p in old_name for p in NO_BUMP_PARTS):
+            graph.set_value(node, 0, new_name)
+        log.statuses.append((node, graph.status[node]))
+        graph.status[node] = STATUS_CHANGED
+    return pending
+
+
+def change_node_and_ancestors(graph, nid, log):
+    # nid 와 그 상위 품번 전체의 첨자를 올린다
+    return bump_revisions(graph, [nid], log)
+
+
+def add_part(graph, parent_name, values, after=None, log=None):
+    # parent_name 품번의 모든 위치에 신규 품번 추가 (after 가 있으면 그 품번 바로 아래)
+    new_nodes = []
+    for parent in find_nodes_by_name(graph, parent_name):
+        pos = None
+        if after is not None:
+            siblings = [nid for nid in graph.children[parent] if graph.value(nid, 0) == after]
+            if not siblings:
+                continue
+            pos = graph.row[siblings[-1]] + 1
+        nid = graph.add_node(parent, values, STATUS_ADDED, pos)
+        new_nodes.append(nid)
+        if log is not None:
+            log.changes.append((nid, '', values[0]))
+    return new_nodes
+
+
+def mark_deleted(graph, name, log=None):
+    # 삭제 품번 체크 (행은 남기고 상태만 변경)
+    nodes = find_nodes_by_name(graph, name)
+    for nid in nodes:
+        graph.status[nid] = STATUS_DELETED
+        if log is not None:
+            log.changes.append((nid, name, ''))
+    return nodes
@@ -0,0 +1,113 @@
+# BomGraph -> DataFrame (엑셀 저장용)
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+from .graph import STATUS_ADDED, STATUS_CHANGED, STATUS_DELETED
+from .trace import traced
+
+EXPORT_COLUMNS = ["LVL", "PARENT", "PREFIX", "ITM", "ITM_DESC", "QTY", "UOM", "SRC", "PROC", "THREAD", "STATUS"]
+
+# 그래프 컬럼 순서 -> 내보내기 컬럼 이름 (CLASS 는 ITM 으로 나감)
+GRAPH_COLUMNS = ["ITM", "PREFIX", "ITM_DESC", "QTY", "UOM", "SRC", "PROC", "THREAD"]
+
+
+@traced("tree_to_dataframe")
+def tree_to_dataframe(graph):
+    # 트리 순서(전위 순회)대로 노드 id 만 모은 뒤, 컬럼별로 한 번에 꺼낸다.
+    # 최상위 노드는 PARENT 로만 쓰이고 행으로는 나가지 않는다.
+    parent = np.array(graph.parent, dtype=np.int32)
+    walked = [(nid, level) for nid, level in graph.walk() if parent[nid] >= 0]
+    order = np.fromiter((nid for nid, _ in walked), dtype=np.intp, count=len(walked))
+    levels = np.fromiter((level for _, level in walked), dtype=np.int32, count=len(walked))
+
+    columns = {name: np.asarray(graph.columns[c], dtype=object) for c, name in enumerate(GRAPH_COLUMNS)}
+    data = {"LVL": levels, "PARENT": columns["ITM"][parent[order]]}
+    for name in ["PREFIX", "ITM", "ITM_DESC", "QTY", "UOM", "SRC", "PROC", "THREAD"]:
+        data[name] = columns[name][order]
+    data["STATUS"] = np.frombuffer(bytes(graph.status), dtype=np.int8)[order]
+    return pd.DataFrame(data, columns=EXPORT_COLUMNS)
+
+
+# 엑셀 저장 (행 단위 스트리밍, 메모리에 워크북 전체를 만들지 않음)
+#   xlsxwriter 가 있으면 constant_memory 모드, 없으면 openpyxl write_only
+#   STATUS 컬럼은 저장하지 않고 행 배경색(추가/변경/삭제)으로만 쓴다
+STATUS_FILLS = {STATUS_ADDED: "FFFF00", STATUS_CHANGED: "FF0000", STATUS_DELETED: "C0C0C0"}
+WRITE_CHUNK_ROWS = 5000
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+@traced("write_bom_xlsx")
+def write_bom_xlsx(df, file_name, sheet_name="Sheet1", status_column="STATUS", chunk_rows=WRITE_CHUNK_ROWS,
+                   progress=None, cancel=None):
+    # progress(쓴 행 수, 전체 행 수) 는 chunk 마다 호출, cancel() 이 True 면 쓰던 파일을 지우고 False 반환
+    if status_column in df.columns:
+        status = df[status_column].to_numpy(dtype=np.int8)
+        df = df.drop(columns=status_column)
+    else:
+        status = np.zeros(len(df), dtype=np.int8)
+
+    writer = _xlsxwriter_rows if importlib.util.find_spec("xlsxwriter") is not None else _openpyxl_rows
+    rows = _row_chunks(df, status, chunk_rows, progress, cancel)
+    try:
+        writer(file_name, sheet_name, [str(c) for c in df.columns], rows)
+    except ExportCancelled:
+        if os.path.exists(file_name):
+            os.remove(file_name)
+        return False
+    return True
+
+
+def _row_chunks(df, status, chunk_rows, progress=None, cancel=None):
+    # (행 값 list, status) 를 chunk 단위로 파이썬 값으로 바꿔 내보낸다 (numpy 타입 -> int/float/str)
+    for start in range(0, len(df), chunk_rows):
+        if cancel is not None and cancel():
+            raise ExportCancelled()
+        if progress is not None:
+            progress(start, len(df))
+        chunk = df.iloc[start:start + chunk_rows]
+        columns = [chunk[c].tolist() for c in chunk.columns]
+        yield from zip(zip(*columns), status[start:start + chunk_rows].tolist())
+
+
+def _xlsxwriter_rows(file_name, sheet_name, header, rows):
+    import xlsxwriter
+
+    wb = xlsxwriter.Workbook(file_name, {"constant_memory": True, "nan_inf_to_errors": True})
+    try:
+        ws = wb.add_worksheet(sheet_name)
+        formats = {code: wb.add_format({"bg_color": "#" + color, "pattern": 1})
+                   for code, color in STATUS_FILLS.items()}
+        ws.write_row(0, 0, header)
+        for r, (values, code) in enumerate(rows, start=1):
+            ws.write_row(r, 0, values, formats.get(code))
+    finally:
+        wb.close()
+
+
+def _openpyxl_rows(file_name, sheet_name, header, rows):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import PatternFill
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    fills = {code: PatternFill("solid", start_color=color, end_color=color) for code, color in STATUS_FILLS.items()}
+    ws.append(header)
+    for values, code in rows:
+        fill = fills.get(code)
+        if fill is None:
+            ws.append(values)
+            continue
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.fill = fill
+            cells.append(cell)
+        ws.append(cells)
+    wb.save(file_name)
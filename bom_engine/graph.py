@@ -0,0 +1,265 @@
+# BOM 그래프 (Qt 없이 동작하는 트리 자료구조)
+from array import array
+
+from .trace import traced
+from .traverse import BomCycleError, ancestors, find_part_cycle, part_path, walk
+
+# 트리 노드 상태 (배경색 대신 저장)
+STATUS_UNCHANGED = 0
+STATUS_ADDED = 1
+STATUS_CHANGED = 2
+STATUS_DELETED = 3
+
+
+class BomGraph:
+    # BOM 트리를 노드 id(배열 인덱스) 기반 배열로 보관
+    #   parent[n]     : 부모 노드 id (-1 = 최상위)
+    #   row[n]        : 부모의 children 목록 안에서의 위치
+    #   children[n]   : 자식 노드 id 목록
+    #   columns[c][n] : 컬럼 c 값 (CLASS, PREFIX, ITM_DESC, ...)
+    #   status[n]     : STATUS_* 코드
+    #   by_name       : 품번 -> 노드 id 목록 (트리에 붙어 있는 노드만, 변경 시 같이 갱신)
+    #   strings       : 문자열 intern 표 - 같은 값은 str 객체 하나를 모든 컬럼 / 색인이 같이 쓴다
+    #   listeners     : 변경 알림을 받을 색인 (검색, where-used 등)
+    #                   node_added(nid) / node_removed(nid) / node_moved(nid, old_parent) /
+    #                   value_changed(nid, col, old, new)
+    COLUMNS = ["CLASS", "PREFIX", "ITM_DESC", "QTY", "UOM", "SRC", "PROC", "THREAD"]
+
+    def __init__(self):
+        self.parent = array('i')
+        self.row = array('i')
+        self.children = []
+        self.roots = []
+        self.columns = [[] for _ in self.COLUMNS]
+        self.status = bytearray()
+        self.by_name = {}
+        self.strings = {}
+        self.listeners = []
+
+    def __len__(self):
+        return len(self.parent)
+
+    @classmethod
+    @traced("BomGraph.from_dataframe")
+    def from_dataframe(cls, df):
+        # create_tree 와 동일한 규칙: PARENT 가 처음 나오면 최상위 노드를 만들고,
+        # 같은 품번이 여러 번 나오면 마지막 노드 아래에 자식을 붙인다.
+        # 품번이 자기 자신의 하위로 들어가는 행이 있으면 BomCycleError.
+        builder = BomBuilder(cls())
+        builder.append(df)
+        return builder.finish()
+
+    def siblings(self, parent):
+        return self.roots if parent < 0 else self.children[parent]
+
+    def add_node(self, parent, values, status=STATUS_UNCHANGED, pos=None):
+        nid = len(self.parent)
+        self.parent.append(parent)
+        self.row.append(0)
+        self.children.append([])
+        intern = self.intern
+        for c, column in enumerate(self.columns):
+            column.append(intern(values[c]) if c < len(values) else '')
+        self.status.append(status)
+        self._link(nid, parent, pos)
+        self.by_name.setdefault(self.columns[0][nid], []).append(nid)
+        for listener in self.listeners:
+            listener.node_added(nid)
+        return nid
+
+    def attach(self, nid, parent, pos=None):
+        self._link(nid, parent, pos)
+        self._index_subtree(nid)
+
+    def detach(self, nid):
+        # 노드 데이터는 남겨두고 부모 목록에서만 뺀다
+        self._unindex_subtree(nid)
+        return self._unlink(nid)
+
+    def attach_range(self, nodes, parent, pos):
+        # detach_range 로 뺀 노드들을 pos 위치에 한 번에 다시 붙인다
+        sibs = self.siblings(parent)
+        sibs[pos:pos] = nodes
+        for nid in nodes:
+            self.parent[nid] = parent
+        self._renumber(sibs, pos)
+        for nid in nodes:
+            self._index_subtree(nid)
+
+    def detach_range(self, parent, first, count):
+        # 형제 first ~ first + count - 1 을 한 번에 분리 (분리한 노드 목록 반환)
+        sibs = self.siblings(parent)
+        nodes = sibs[first:first + count]
+        for nid in nodes:
+            self._unindex_subtree(nid)
+        del sibs[first:first + count]
+        self._renumber(sibs, first)
+        return nodes
+
+    def move(self, nid, pos):
+        self.move_range(self.parent[nid], self.row[nid], 1, pos)
+
+    def move_range(self, parent, first, count, pos):
+        # 형제 first ~ first + count - 1 을 옮겨서 첫 행이 pos 에 오도록 (pos 는 옮긴 뒤 기준)
+        sibs = self.siblings(parent)
+        block = sibs[first:first + count]
+        del sibs[first:first + count]
+        sibs[pos:pos] = block
+        self._renumber(sibs, min(first, pos))
+
+    def reparent(self, nid, parent, pos=None):
+        # nid 서브트리를 다른 부모 아래로 옮긴다 (품번 색인은 그대로, listener 에는 node_moved)
+        self.reparent_range(self.parent[nid], self.row[nid], 1, parent, pos)
+
+    def reparent_range(self, old_parent, first, count, parent, pos=None):
+        # 형제 first ~ first + count - 1 을 parent 의 pos 위치로 한 번에 옮긴다
+        sibs = self.siblings(old_parent)
+        block = sibs[first:first + count]
+        for nid in block:
+            self.check_reparent(nid, parent)
+        del sibs[first:first + count]
+        self._renumber(sibs, first)
+
+        dest = self.siblings(parent)
+        if pos is None:
+            pos = len(dest)
+        dest[pos:pos] = block
+        for nid in block:
+            self.parent[nid] = parent
+        self._renumber(dest, pos)
+        for nid in block:
+            for listener in self.listeners:
+                listener.node_moved(nid, old_parent)
+
+    def check_reparent(self, nid, parent):
+        # 새 부모 경로에 서브트리 안의 품번이 있으면 품번이 자기 하위로 들어가므로 BomCycleError
+        if parent < 0:
+            return
+        names = {self.columns[0][node] for node, _ in self.walk(nid)}
+        for node in [parent] + list(self.ancestors(parent)):
+            if node == nid or self.columns[0][node] in names:
+                raise BomCycleError(part_path(self, parent) + [self.columns[0][nid]])
+
+    def _index_subtree(self, nid):
+        for node, _ in self.walk(nid):
+            self.by_name.setdefault(self.columns[0][node], []).append(node)
+            for listener in self.listeners:
+                listener.node_added(node)
+
+    def _unindex_subtree(self, nid):
+        for node, _ in self.walk(nid):
+            self._unindex(node, self.columns[0][node])
+            for listener in self.listeners:
+                listener.node_removed(node)
+
+    def _link(self, nid, parent, pos=None):
+        sibs = self.siblings(parent)
+        if pos is None:
+            pos = len(sibs)
+        sibs.insert(pos, nid)
+        self.parent[nid] = parent
+        self._renumber(sibs, pos)
+
+    def _unlink(self, nid):
+        sibs = self.siblings(self.parent[nid])
+        pos = self.row[nid]
+        del sibs[pos]
+        self._renumber(sibs, pos)
+        return pos
+
+    def _unindex(self, nid, name):
+        nodes = self.by_name.get(name)
+        if nodes is None or nid not in nodes:
+            return False
+        nodes.remove(nid)
+        if not nodes:
+            del self.by_name[name]
+        return True
+
+    def _renumber(self, sibs, start):
+        row = self.row
+        for i in range(start, len(sibs)):
+            row[sibs[i]] = i
+
+    def attached(self, nid):
+        # 삭제된(분리된) 서브트리에 속하지 않았는지 확인
+        for node in [nid] + list(self.ancestors(nid)):
+            sibs = self.siblings(self.parent[node])
+            pos = self.row[node]
+            if pos >= len(sibs) or sibs[pos] != node:
+                return False
+        return True
+
+    def intern(self, value):
+        return self.strings.setdefault(value, value)
+
+    def value(self, nid, col):
+        return self.columns[col][nid]
+
+    def set_value(self, nid, col, value):
+        value = self.intern(value)
+        old = self.columns[col][nid]
+        if col == 0 and self._unindex(nid, old):
+            self.by_name.setdefault(value, []).append(nid)
+        self.columns[col][nid] = value
+        for listener in self.listeners:
+            listener.value_changed(nid, col, old, value)
+
+    def find(self, name):
+        # 품번으로 노드 찾기 (트리 순회 없이 by_name 조회)
+        return list(self.by_name.get(name, ()))
+
+    def depth(self, nid):
+        return sum(1 for _ in ancestors(self, nid))
+
+    def ancestors(self, nid):
+        return ancestors(self, nid)
+
+    def walk(self, start=None):
+        # 전위 순회 (nid, depth), start 가 있으면 그 노드의 서브트리만
+        return walk(self, start)
+
+
+class BomBuilder:
+    # from_dataframe 을 청크 단위로 (스트리밍 로드에서 행이 도착하는 대로 트리에 붙임)
+    # add_node(parent, values) 를 넘기면 그 함수로 노드를 만든다 (Qt 모델의 행 추가 알림용).
+    VALUE_COLUMNS = ["PREFIX", "ITM_DESC", "QTY", "UOM", "SRC", "PROC", "THREAD"]
+
+    def __init__(self, graph=None):
+        self.graph = graph if graph is not None else BomGraph()
+        self.parent_dict = {}
+        self.parents = []
+        self.itms = []
+
+    def append(self, df, add_node=None):
+        add_node = add_node or self.graph.add_node
+        itms = column_strings(df['ITM'])
+        parents = column_strings(df['PARENT'])
+        values = [itms] + [column_strings(df[c]) for c in self.VALUE_COLUMNS]
+
+        parent_dict = self.parent_dict
+        for i in range(len(itms)):
+            parent_itm = parents[i]
+            if parent_itm not in parent_dict:
+                parent_dict[parent_itm] = add_node(-1, [parent_itm])
+            parent_dict[itms[i]] = add_node(parent_dict[parent_itm], [col[i] for col in values])
+        self.parents.extend(parents)
+        self.itms.extend(itms)
+
+    @traced("BomBuilder.finish")
+    def finish(self):
+        cycle = find_part_cycle(self.parents, self.itms)
+        if cycle:
+            raise BomCycleError(*cycle)
+        return self.graph
+
+
+def column_strings(series):
+    # 컬럼 값을 str 목록으로. category 컬럼은 고유값만 str 로 바꾸고 코드로 펼친다 (같은 값 = 같은 str 객체)
+    try:
+        codes = series.cat.codes.tolist()
+        categories = [str(v) for v in series.cat.categories]
+    except AttributeError:
+        return [str(v) for v in series.tolist()]
+    categories.append('nan')    # 코드 -1 (결측)
+    return [categories[code] for code in codes]
@@ -0,0 +1,149 @@
+# 엑셀(ECO) 파일 읽기
+import datetime
+import importlib.util
+
+import pandas as pd
+
+from .trace import traced
+
+ECO_SHEET = "ECO_BOM"
+ECO_COLUMNS = 11        # ECO_BOM 에서 사용하는 컬럼 수
+ECO_HEADER_ROW = 4      # 헤더(LVL, PARENT, ...) 행 위치 (빈 행도 세는 실제 행 번호, 0부터)
+CHUNK_ROWS = 2000       # 스트리밍 로드 시 한 번에 넘기는 행 수
+
+# 같은 값이 수천 번 반복되는 컬럼은 category 로 (고유 문자열 한 번 + 정수 코드)
+CATEGORY_COLUMNS = ["PARENT", "ITM", "UOM", "SRC", "PROC", "THREAD"]
+
+
+def excel_engine():
+    # python-calamine 이 설치되어 있으면 사용 (openpyxl 보다 빠름)
+    if importlib.util.find_spec("python_calamine") is not None:
+        return "calamine"
+    return "openpyxl"
+
+
+@traced("read_eco_bom")
+def read_eco_bom(file_name, engine=None):
+    # ECO_BOM 시트의 앞 11개 컬럼만 읽는다 (다른 시트는 열지 않음)
+    raw = pd.read_excel(file_name, sheet_name=ECO_SHEET, header=None,
+                        usecols=range(ECO_COLUMNS), engine=engine or excel_engine())
+    return clean_eco_bom(raw)
+
+
+def clean_eco_bom(raw):
+    # 시트의 5번째 행이 헤더 (제목 부분의 빈 행도 센다), 그 아래가 BOM. 빈 행은 헤더 아래에서만 뺀다.
+    header = [str(c).replace('\n', '') for c in raw.iloc[ECO_HEADER_ROW]]
+    df = raw.iloc[ECO_HEADER_ROW + 1:].dropna(axis=0, how='all')
+    df.columns = header
+    df = df.replace('\n', '', regex=True)
+    df = categorize(df.fillna(0).reset_index(drop=True))
+    df.name = ECO_SHEET
+    return df
+
+
+def categorize(df, columns=CATEGORY_COLUMNS):
+    # 값은 문자열로 맞춘 뒤 category 로 (fillna(0) 의 0 도 "0")
+    for c in columns:
+        if c in df.columns:
+            df[c] = df[c].astype(str).astype("category")
+    return df
+
+
+def iter_eco_bom(file_name, chunk_rows=CHUNK_ROWS, engine=None):
+    # ECO_BOM 을 위에서부터 읽으며 chunk_rows 행씩 정리된 DataFrame 을 낸다
+    # (clean_eco_bom 과 같은 규칙: 헤더는 실제 행 번호로 찾고 빈 행은 헤더 아래에서만 뺀다. 행 번호는 청크를 이어도 연속)
+    read_rows = _calamine_rows if (engine or excel_engine()) == "calamine" else _openpyxl_rows
+    header, rows, start = None, [], 0
+    for i, values in enumerate(read_rows(file_name)):
+        if header is None:
+            if i == ECO_HEADER_ROW:
+                values = tuple(values) + (None,) * (ECO_COLUMNS - len(values))
+                header = [str(c).replace('\n', '') for c in values]
+            continue
+        if all(v is None for v in values):
+            continue
+        rows.append(tuple(values) + (None,) * (ECO_COLUMNS - len(values)))
+        if len(rows) >= chunk_rows:
+            yield _chunk_frame(rows, header, start)
+            start += len(rows)
+            rows = []
+    if rows:
+        yield _chunk_frame(rows, header, start)
+
+
+@traced("stream_eco_bom")
+def stream_eco_bom(file_name, on_chunk, chunk_rows=CHUNK_ROWS, engine=None):
+    # 청크마다 on_chunk(df) 를 부르고 전체 DataFrame 을 반환
+    chunks = []
+    for chunk in iter_eco_bom(file_name, chunk_rows, engine):
+        on_chunk(chunk)
+        chunks.append(chunk)
+    # 청크마다 category 를 만들면 이어 붙일 때 object 로 돌아가므로 전체를 모은 뒤 한 번에
+    df = categorize(pd.concat(chunks)) if chunks else pd.DataFrame()
+    df.name = ECO_SHEET
+    return df
+
+
+def _chunk_frame(rows, header, start):
+    df = pd.DataFrame(rows, columns=header, dtype=object, index=range(start, start + len(rows)))
+    return df.replace('\n', '', regex=True).fillna(0)
+
+
+def _openpyxl_rows(file_name):
+    # 시트 행 단위 (read_only: 파일에서 한 행씩 읽는다, 빈 행도 그대로 나온다)
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_name, read_only=True, data_only=True)
+    try:
+        yield from wb[ECO_SHEET].iter_rows(max_col=ECO_COLUMNS, values_only=True)
+    finally:
+        wb.close()
+
+
+def _calamine_rows(file_name):
+    # 시트 행 단위 (calamine: 시트 하나를 한 번에 파싱한 뒤 행을 넘긴다, openpyxl 보다 몇 배 빠름)
+    # pandas 의 calamine 읽기처럼 to_python(skip_empty_area=False) 로 A1 부터 받는다
+    # (iter_rows 는 작업 스레드에서 쓰면 python-calamine 안에서 참조 카운트가 깨져 프로세스가 죽는다)
+    from python_calamine import CalamineWorkbook
+
+    wb = CalamineWorkbook.from_path(file_name)
+    try:
+        rows = wb.get_sheet_by_name(ECO_SHEET).to_python(skip_empty_area=False)
+    finally:
+        wb.close()
+    for values in rows:
+        yield tuple(map(_calamine_value, values[:ECO_COLUMNS]))
+
+
+def _calamine_value(value):
+    # pandas 의 calamine 읽기와 같게: 빈 칸은 None, 정수인 실수는 int, 날짜는 datetime
+    if value == "":
+        return None
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        return datetime.datetime(value.year, value.month, value.day)
+    return value
+
+
+class EcoWorkbook:
+    # ECO_BOM 시트만 읽는다 (다른 시트는 열지 않음)
+    # on_chunk 를 주면 ECO_BOM 을 청크 단위로 읽으면서 on_chunk(df) 로 넘긴다 (캐시에 있으면 전체를 한 번에)
+    def __init__(self, file_name, engine=None, cache=None, on_chunk=None):
+        self.file_name = file_name
+        self.engine = engine or excel_engine()
+        streamed = []
+        if on_chunk is not None:
+            def reader(f):
+                streamed.append(True)
+                return stream_eco_bom(f, on_chunk, engine=self.engine)
+        else:
+            def reader(f):
+                return read_eco_bom(f, self.engine)
+        if cache is not None:   # bom_engine.cache.BomCache
+            self.eco_bom = cache.load(file_name, reader)
+            self.eco_bom.name = ECO_SHEET
+        else:
+            self.eco_bom = reader(file_name)
+        if on_chunk is not None and not streamed:
+            on_chunk(self.eco_bom)
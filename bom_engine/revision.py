@@ -0,0 +1,75 @@
+# 품번 첨자(리비전) 규칙
+#   PART : 6자리-5자리 + 첨자, 소재 품번은 뒤에 -M   (예: 100001-00001B, 100001-00001B-M)
+#   S    : S + 7자리 (+ 첨자)
+#   R    : R + 5, 6자리 + 첨자
+#   그 외 : 마지막 글자가 첨자 (숫자로 끝나면 A 를 붙인다)
+# 첨자는 A -> B -> ... -> Z, I 와 O 는 쓰지 않는다.
+import re
+
+REVISION_LETTERS = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+
+# 다음 첨자 표 (Z 는 없음 -> RevisionError)
+NEXT_REVISION = dict(zip(REVISION_LETTERS, REVISION_LETTERS[1:]))
+NEXT_REVISION.update({"I": "J", "O": "P"})     # 예전 데이터에 남아 있는 I, O
+NEXT_REVISION.update({k.lower(): v for k, v in list(NEXT_REVISION.items())})
+FIRST_REVISION = REVISION_LETTERS[0]
+
+# 품번 입력 규칙 (AddRowDialog 의 rule1/2/3)
+PART_RULES = [
+    re.compile(r'\d{6}-\d{5}[A-Za-z]?(-(M|m))?'),  # 6자리 숫자 다음에 + '-'+ 5자리 숫자 + 첨자 + m(소재품번?)
+    re.compile(r'S\d{7}[A-Za-z]?'),                # S + 7자리 + 첨자 (설변하면 첨자가 붙는다)
+    re.compile(r'R\d{5,6}[a-zA-Z]?'),              # R + 5, 6자리 + 첨자
+]
+
+# 첨자 위치: (본체, 첨자, 뒤에 붙는 부분)
+FAMILIES = [
+    ("PART", re.compile(r'(\d{6}-\d{5})([A-Za-z]?)(-[Mm])?')),
+    ("S", re.compile(r'(S\d{7})([A-Za-z]?)()')),
+    ("R", re.compile(r'(R\d{5,6})([A-Za-z]?)()')),
+    ("OTHER", re.compile(r'(.*?)([A-Za-z]?)()', re.S)),
+]
+
+
+class RevisionError(ValueError):
+    pass
+
+
+def split_revision(name):
+    # (family, 본체, 첨자, 뒤에 붙는 부분)
+    for family, pattern in FAMILIES:
+        m = pattern.fullmatch(name)
+        if m:
+            return (family,) + tuple(g or "" for g in m.groups())
+
+
+def bump_revision(name):
+    # 다음 첨자 품번. 빈 품번은 그대로, Z 다음은 RevisionError
+    if not name:
+        return name
+    _, base, rev, tail = split_revision(name)
+    if not rev:
+        return base + FIRST_REVISION + tail
+    if rev not in NEXT_REVISION:
+        raise RevisionError('Z 이상의 첨자 품번을 생성할 수 없습니다.')
+    return base + NEXT_REVISION[rev] + tail
+
+
+def bump_series(values, errors="raise"):
+    # 컬럼 전체 첨자 올리기 (list 반환, df[col] = bump_series(df[col]) 처럼 사용)
+    # 같은 품번이 반복되므로 고유값만 한 번씩 계산한다.
+    # errors="keep" 이면 더 올릴 수 없는 품번은 그대로 둔다.
+    table = {}
+    out = []
+    for name in values:
+        name = str(name)
+        new_name = table.get(name)
+        if new_name is None:
+            try:
+                new_name = bump_revision(name)
+            except RevisionError:
+                if errors != "keep":
+                    raise
+                new_name = name
+            table[name] = new_name
+        out.append(new_name)
+    return out
@@ -0,0 +1,106 @@
+# 소요량 집계 (QTY 를 경로를 따라 곱한 값을 품번별로 합산)
+# 트리를 경로마다 다시 훑지 않고 품번 단위 그래프(상위 품번 -> (하위 품번, QTY))로 바꾼 뒤
+# 위상 순서로 한 번씩만 전개한다. 여러 ASSY 에 쓰인 공용 SUB ASSY 도 하위 구성은 한 번만 계산.
+#   총소요량(품번) = sum(총소요량(상위 품번) * QTY)   최상위 PARENT 는 1
+import pandas as pd
+
+from .graph import STATUS_DELETED
+from .trace import traced
+from .traverse import BomCycleError
+
+ROLLUP_COLUMNS = ["ITM", "ITM_DESC", "UOM", "TOTAL_QTY", "LEAF"]
+
+
+def part_edges(graph, include_deleted=False):
+    # 품번 -> [(하위 품번, QTY)]. 같은 품번이 여러 번 나오면 자식이 있는 첫 노드를 그 품번의 구성으로 본다.
+    # QTY 를 숫자로 읽을 수 없으면 0 (입력 규칙 위반은 validate 에서 따로 보여 준다)
+    # 반환: (edges, 최상위 품번 목록, 처음 나온 노드 {품번: nid})
+    names = graph.columns[0]
+    qty_column = graph.columns[3]
+    children = graph.children
+    status = graph.status
+    edges, first = {}, {}
+    qty_cache = {}
+
+    stack = list(reversed(graph.roots))
+    while stack:
+        nid = stack.pop()
+        name = names[nid]
+        first.setdefault(name, nid)
+        kids = [child for child in children[nid] if include_deleted or status[child] != STATUS_DELETED]
+        if not kids or name in edges:
+            stack.extend(reversed(kids))
+            continue
+        row = edges[name] = []
+        for child in kids:
+            text = qty_column[child]
+            qty = qty_cache.get(text)
+            if qty is None:
+                try:
+                    qty = float(text)
+                except ValueError:
+                    qty = 0.0
+                qty_cache[text] = qty
+            row.append((names[child], qty))
+        stack.extend(reversed(kids))
+    roots = [names[nid] for nid in graph.roots]
+    return edges, roots, first
+
+
+def rollup_quantities(graph, include_deleted=False):
+    # {품번: 총소요량}. 삭제 표시(STATUS_DELETED)된 행과 그 하위는 기본으로 빠진다.
+    edges, roots, _ = part_edges(graph, include_deleted)
+    return _propagate(edges, roots)
+
+
+@traced("rollup_table")
+def rollup_table(graph, include_deleted=False):
+    # 품번별 총소요량 표 (트리에 처음 나온 순서, LEAF = 하위 구성이 없는 품번). 최상위 PARENT 는 빼고 낸다.
+    edges, roots, first = part_edges(graph, include_deleted)
+    totals = _propagate(edges, roots)
+    root_names = set(roots)
+    names = [name for name in first if name in totals and name not in root_names]
+    nodes = [first[name] for name in names]
+    return pd.DataFrame({
+        "ITM": names,
+        "ITM_DESC": [graph.columns[2][nid] for nid in nodes],
+        "UOM": [graph.columns[4][nid] for nid in nodes],
+        "TOTAL_QTY": [totals[name] for name in names],
+        "LEAF": [name not in edges for name in names],
+    }, columns=ROLLUP_COLUMNS)
+
+
+def _propagate(edges, roots):
+    # Kahn 위상 정렬: 상위 품번이 모두 끝난 뒤에 하위 품번을 전개 (품번마다 한 번)
+    indegree = {}
+    for name in _reachable(edges, roots):
+        for child, _ in edges.get(name, ()):
+            indegree[child] = indegree.get(child, 0) + 1
+
+    totals = {}
+    for name in roots:
+        totals[name] = totals.get(name, 0.0) + 1.0
+    ready = [name for name in dict.fromkeys(roots) if indegree.get(name, 0) == 0]
+    while ready:
+        name = ready.pop()
+        total = totals[name]
+        for child, qty in edges.get(name, ()):
+            totals[child] = totals.get(child, 0.0) + total * qty
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+    remaining = [name for name, count in indegree.items() if count > 0]
+    if remaining:
+        raise BomCycleError(remaining[:10])
+    return totals
+
+
+def _reachable(edges, roots):
+    seen = dict.fromkeys(roots)
+    stack = list(seen)
+    while stack:
+        for child, _ in edges.get(stack.pop(), ()):
+            if child not in seen:
+                seen[child] = None
+                stack.append(child)
+    return seen
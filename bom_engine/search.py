@@ -0,0 +1,65 @@
+# 트리 검색 색인 (ITM / ITM_DESC / PREFIX)
+# 필드별로 소문자 값을 트리 순서대로 '\0' 로 이어 붙인 문자열 하나와 각 값의 시작 위치 배열을 둔다.
+# 검색은 re.finditer 로 한 번 훑고(C 속도) 위치 -> 노드는 searchsorted 로 찾는다.
+# 그래프가 바뀌면 dirty 로 표시만 하고 다음 검색 때 다시 만든다.
+import re
+
+import numpy as np
+
+SEARCH_FIELDS = {"ITM": 0, "PREFIX": 1, "ITM_DESC": 2}     # 필드 -> BomGraph 컬럼
+SEPARATOR = "\0"
+
+
+class SearchIndex:
+    def __init__(self, graph, fields=SEARCH_FIELDS):
+        self.graph = graph
+        self.fields = dict(fields)
+        self.dirty = True
+        self._nodes = np.empty(0, dtype=np.int64)
+        self._texts = {}
+        self._starts = {}
+        graph.listeners.append(self)
+
+    def rebuild(self):
+        graph = self.graph
+        nodes = [nid for nid, _ in graph.walk()]
+        self._nodes = np.asarray(nodes, dtype=np.int64)
+        for field, col in self.fields.items():
+            values = graph.columns[col]
+            texts = [values[nid].lower() for nid in nodes]
+            lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=len(texts))
+            self._starts[field] = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(texts) else lengths
+            self._texts[field] = SEPARATOR.join(texts)
+        self.dirty = False
+
+    def search(self, term, fields=None):
+        # term 을 포함하는 노드 id (트리 순서, 대소문자 무시)
+        term = term.lower()
+        if not term or SEPARATOR in term:
+            return []
+        if self.dirty:
+            self.rebuild()
+
+        pattern = re.compile(re.escape(term))
+        hits = []
+        for field in fields or self.fields:
+            positions = [m.start() for m in pattern.finditer(self._texts[field])]
+            if positions:
+                hits.append(np.searchsorted(self._starts[field], positions, side="right") - 1)
+        if not hits:
+            return []
+        return self._nodes[np.unique(np.concatenate(hits))].tolist()
+
+    # BomGraph listener
+    def node_added(self, nid):
+        self.dirty = True
+
+    def node_removed(self, nid):
+        self.dirty = True
+
+    def node_moved(self, nid, old_parent):
+        self.dirty = True       # 트리 순서가 바뀜
+
+    def value_changed(self, nid, col, old, new):
+        if not self.dirty and col in self.fields.values():
+            self.dirty = True
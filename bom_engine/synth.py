@@ -0,0 +1,174 @@
+# 성능 측정용 가상 ECO_BOM (실제 BOM 은 외부 반출이 안 되므로)
+#   synthetic_bom      : 행 수 / 깊이 / 하위 개수(fanout) / 공용 SUB ASSY 비율을 정해 전개형(LVL 순서) BOM 생성
+#   write_eco_workbook : loadData 가 읽는 형식의 엑셀로 저장 (행 단위 스트리밍)
+#
+#   python -m bom_engine.synth out.xlsx --rows 300000 --depth 6 --fanout 8 --shared 0.2 --sheets 3
+import argparse
+import importlib.util
+import random
+import sys
+import time
+from itertools import chain
+
+import pandas as pd
+
+from .loader import ECO_HEADER_ROW, ECO_SHEET
+from .revision import REVISION_LETTERS
+
+ECO_BOM_COLUMNS = ["LVL", "PARENT", "PREFIX", "ITM", "ITM_DESC", "QTY", "UOM", "SRC", "PROC", "THREAD", "FLAG"]
+TOP_ASSEMBLY = "620100-00001"
+
+# 품번 형식 비율 (AddRowDialog 의 rule1 / rule2 / rule3 = revision.PART_RULES)
+PART_MIX = (0.85, 0.1, 0.05)
+MATERIAL_RATIO = 0.05       # rule1 품번 중 -M (소재 품번) 비율
+
+
+class PartNumbers:
+    # 겹치지 않는 품번 발급 (rule1: 6자리-5자리 + 첨자 (+ -M), rule2: S + 7자리 (+ 첨자), rule3: R + 5, 6자리 + 첨자)
+    def __init__(self, rng, mix=PART_MIX, material_ratio=MATERIAL_RATIO):
+        self.rng = rng
+        self.mix = mix
+        self.material_ratio = material_ratio
+        self.serial = [0, 0, 0]
+
+    def new(self, leaf=False):
+        rng = self.rng
+        rule = rng.choices((0, 1, 2), self.mix)[0]
+        self.serial[rule] += 1
+        n = self.serial[rule]
+        rev = rng.choice(("",) + tuple(REVISION_LETTERS[:3]))
+        if rule == 1:
+            return "S%07d" % (n % 10000000)
+        if rule == 2:
+            return "R%06d%s" % (n % 1000000, rev)
+        name = "%06d-%05d%s" % (100000 + n // 100000, n % 100000, rev)
+        if leaf and rng.random() < self.material_ratio:
+            name += "-M"
+        return name
+
+
+def synthetic_bom(rows, depth=4, fanout=5, assembly_ratio=0.3, shared_ratio=0.0, seed=0, mix=PART_MIX):
+    # 최상위 ASSY 아래에 SUB ASSY 를 행 수가 찰 때까지 반복해서 붙인다.
+    # 각 SUB ASSY 는 하위 품번 fanout 개, 그중 assembly_ratio 비율은 (depth 까지) 다시 SUB ASSY.
+    # shared_ratio 비율의 SUB ASSY 자리는 이미 만든 SUB ASSY 를 다시 쓴다 (전개형이므로 하위 행도 같이 반복).
+    rng = random.Random(seed)
+    parts = PartNumbers(rng, mix)
+    out = {c: [] for c in ECO_BOM_COLUMNS}
+    lvl, itm_column = out["LVL"], out["ITM"]
+    finished = []       # 다 만든 SUB ASSY: (시작 행, 끝 행, 하위 최대 깊이)
+
+    def add(level, parent, position, itm):
+        lvl.append(level)
+        out["PARENT"].append(parent)
+        out["PREFIX"].append("%04d" % (10 * position % 10000))
+        itm_column.append(itm)
+        out["ITM_DESC"].append("PART %s" % itm)
+        out["QTY"].append(rng.randint(1, 4))
+        out["UOM"].append(rng.choice(("EA", "EA", "EA", "M", "KG")))
+        out["SRC"].append(rng.choice(("M", "P")))
+        out["PROC"].append(rng.choice(("ASSY", "PRESS", "WELD", "PAINT")))
+        out["THREAD"].append("")
+        out["FLAG"].append("")
+
+    def reuse(level, parent, position):
+        # 깊이 제한과 남은 행 수에 맞는 공용 SUB ASSY 를 골라 그 행들을 레벨만 바꿔 복사
+        for _ in range(3):
+            start, end, height = finished[rng.randrange(len(finished))]
+            if level + height <= depth and len(itm_column) + end - start <= rows:
+                break
+        else:
+            return False
+        shift = level - lvl[start]
+        add(level, parent, position, itm_column[start])
+        for r in range(start + 1, end):
+            lvl.append(lvl[r] + shift)
+            for c in ECO_BOM_COLUMNS[1:]:
+                out[c].append(out[c][r])
+        return True
+
+    # 재귀 대신 스택 (전위 순서): (레벨, 상위 품번, 형제 안에서 순번) 또는 SUB ASSY 끝 표시 (None, 시작 행, 0)
+    top = 0
+    while len(itm_column) < rows:
+        top += 1
+        stack = [(1, TOP_ASSEMBLY, top)]
+        while stack and len(itm_column) < rows:
+            level, parent, position = stack.pop()
+            if level is None:
+                start = parent
+                finished.append((start, len(itm_column), max(lvl[start:]) - lvl[start]))
+                continue
+            assembly = level < depth and (level == 1 or rng.random() < assembly_ratio)
+            if assembly and finished and rng.random() < shared_ratio and reuse(level, parent, position):
+                continue
+            itm = parts.new(leaf=not assembly)
+            add(level, parent, position, itm)
+            if assembly:
+                stack.append((None, len(itm_column) - 1, 0))
+                stack.extend((level + 1, itm, i) for i in range(fanout, 0, -1))
+    return pd.DataFrame(out, columns=ECO_BOM_COLUMNS)
+
+
+def write_eco_workbook(df, file_name, sheets=1, extra_rows=100):
+    # ECO_BOM 시트: 제목 행 ECO_HEADER_ROW 개 -> 헤더 -> BOM (loader.clean_eco_bom 과 같은 배치)
+    # sheets > 1 이면 ECO_BOM 앞에 목록 시트를 extra_rows 행씩 (실제 파일처럼 다른 시트가 섞여 있게)
+    title = [["ECO BOM"], ["SYNTHETIC %d ROWS" % len(df)], ["REV A"], ["DATE"]][:ECO_HEADER_ROW]
+    header = [str(c) for c in df.columns]
+    bom_rows = chain(title, [header], zip(*(df[c].tolist() for c in df.columns)))
+    extra = [("SHEET%d" % (i + 1), _extra_rows(df, extra_rows)) for i in range(sheets - 1)]
+    writer = _xlsxwriter_sheets if importlib.util.find_spec("xlsxwriter") is not None else _openpyxl_sheets
+    writer(file_name, extra + [(ECO_SHEET, bom_rows)])
+    return file_name
+
+
+def _extra_rows(df, count):
+    head = df.head(count)
+    return chain([["NO", "ITM", "ITM_DESC"]],
+                 zip(range(1, len(head) + 1), head["ITM"].tolist(), head["ITM_DESC"].tolist()))
+
+
+def _xlsxwriter_sheets(file_name, sheets):
+    import xlsxwriter
+
+    # constant_memory: 시트마다 위에서부터 한 행씩 쓰고 바로 파일로 내보낸다
+    wb = xlsxwriter.Workbook(file_name, {"constant_memory": True})
+    try:
+        for name, rows in sheets:
+            ws = wb.add_worksheet(name)
+            for r, values in enumerate(rows):
+                ws.write_row(r, 0, values)
+    finally:
+        wb.close()
+
+
+def _openpyxl_sheets(file_name, sheets):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for name, rows in sheets:
+        ws = wb.create_sheet(name)
+        for values in rows:
+            ws.append(list(values))
+    wb.save(file_name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bom_engine.synth", description="가상 ECO_BOM 엑셀 생성")
+    parser.add_argument("output", help="저장할 엑셀 파일 (.xlsx)")
+    parser.add_argument("--rows", type=int, default=10000, help="BOM 행 수")
+    parser.add_argument("--depth", type=int, default=4, help="최대 LVL")
+    parser.add_argument("--fanout", type=int, default=5, help="SUB ASSY 하위 품번 수")
+    parser.add_argument("--assembly-ratio", type=float, default=0.3, help="하위 품번 중 SUB ASSY 비율")
+    parser.add_argument("--shared", type=float, default=0.0, help="이미 만든 SUB ASSY 를 다시 쓰는 비율")
+    parser.add_argument("--sheets", type=int, default=1, help="시트 수 (ECO_BOM 포함)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df = synthetic_bom(args.rows, args.depth, args.fanout, args.assembly_ratio, args.shared, args.seed)
+    write_eco_workbook(df, args.output, args.sheets)
+    print("%d rows -> %s (%.1fs)" % (len(df), args.output, time.perf_counter() - start))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
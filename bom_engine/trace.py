@@ -0,0 +1,108 @@
+# 동작별 소요 시간 기록 (span)
+# 꺼져 있을 때는 enabled 확인 한 번만 하고 바로 실행한다 (기록, 시간 측정 없음).
+# 켜면 span 마다 (이름, 분류, 시작, 길이, 스레드, 인자) 를 남기고 Chrome trace JSON 으로 저장할 수 있다.
+# 저장한 파일은 chrome://tracing 또는 https://ui.perfetto.dev 에서 연다.
+#   BOM_TRACE=1 로 실행하면 처음부터 켜진다.
+#
+#   with span("tree_to_dataframe", rows=n): ...
+#   @traced("loadData")
+#   def loadData(...): ...
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+MAX_SPANS = 100000      # 오래된 span 부터 버린다
+
+
+class Tracer:
+    def __init__(self, enabled=False, max_spans=MAX_SPANS):
+        self.enabled = enabled
+        self.spans = collections.deque(maxlen=max_spans)    # (name, cat, start_ns, dur_ns, tid, 스레드 이름, args)
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name, cat="bom", **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def traced(self, name=None, cat="bom"):
+        # 함수 전체를 span 으로 (시그널 연결용 시그니처는 functools.wraps 로 유지)
+        def decorator(func):
+            label = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, label, cat, None):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def clear(self):
+        self.spans.clear()
+
+    def records(self):
+        # [(name, cat, 시작 ms, 길이 ms, 스레드 이름, args)] 기록 순서 (끝난 순서)
+        return [(name, cat, (start - self.origin) / 1e6, dur / 1e6, thread, args)
+                for name, cat, start, dur, _, thread, args in list(self.spans)]
+
+    def chrome_trace(self):
+        # Chrome trace event 형식 ("X" = 시작 + 길이, 단위 us)
+        pid = os.getpid()
+        spans = list(self.spans)
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread}}
+                  for tid, thread in {s[4]: s[5] for s in spans}.items()]
+        for name, cat, start, dur, tid, _, args in spans:
+            event = {"name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+                     "ts": (start - self.origin) / 1000, "dur": dur / 1000}
+            if args:
+                event["args"] = {k: str(v) for k, v in args.items()}
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, file_name):
+        with open(file_name, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+        return file_name
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer, self.name, self.cat, self.args = tracer, name, cat, args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        args = self.args
+        if exc_type is not None:
+            args = dict(args or {}, error=exc_type.__name__)
+        thread = threading.current_thread()     # Qt 스레드 풀 스레드는 Dummy-N
+        self.tracer.spans.append((self.name, self.cat, self.start, end - self.start, thread.ident, thread.name, args))
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+# 프로세스 전체에서 하나 (GUI 디버그 창과 bom_engine 이 같이 씀)
+TRACER = Tracer(enabled=os.environ.get("BOM_TRACE") == "1")
+span = TRACER.span
+traced = TRACER.traced
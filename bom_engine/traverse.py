@@ -0,0 +1,80 @@
+# 트리 순회 유틸리티 (재귀 대신 명시적 스택, 순환 참조 검사)
+# 깊은 BOM 에서도 RecursionError 없이 동작하고, 잘못된 데이터는 경로를 포함한 BomCycleError 로 알린다.
+
+
+class BomCycleError(ValueError):
+    def __init__(self, names, row=None):
+        self.names = list(names)
+        self.row = row
+        where = "" if row is None else "ECO_BOM %d번째 행: " % (row + 1)
+        super().__init__("BOM 순환 참조 - %s%s" % (where, " > ".join(self.names)))
+
+
+def walk(graph, start=None):
+    # 전위 순회 (nid, depth), start 가 있으면 그 노드의 서브트리만
+    children = graph.children
+    stack = [(nid, 0) for nid in reversed(graph.roots)] if start is None else [(start, 0)]
+    seen = set()
+    while stack:
+        nid, depth = stack.pop()
+        if nid in seen:
+            raise BomCycleError(part_path(graph, nid))
+        seen.add(nid)
+        yield nid, depth
+        kids = children[nid]
+        if kids:
+            stack.extend((child, depth + 1) for child in reversed(kids))
+
+
+def ancestors(graph, nid):
+    # 부모부터 최상위까지
+    parent = graph.parent
+    seen = {}
+    nid = parent[nid]
+    while nid >= 0:
+        if nid in seen:
+            raise BomCycleError([graph.value(n, 0) for n in seen] + [graph.value(nid, 0)])
+        seen[nid] = True
+        yield nid
+        nid = parent[nid]
+
+
+def part_path(graph, nid, limit=1000):
+    # 최상위 -> nid 까지의 품번 (순환이 있어도 limit 에서 멈춤)
+    names = []
+    while nid >= 0 and len(names) < limit:
+        names.append(graph.value(nid, 0))
+        nid = graph.parent[nid]
+    names.reverse()
+    return names
+
+
+def find_part_cycle(parents, itms):
+    # PARENT -> ITM 관계를 품번 단위 그래프로 보고 순환(자기 자신을 하위로 포함)을 찾는다.
+    # 반복 DFS (색칠) O(행 수). 순환이 있으면 (품번 경로, 행 번호), 없으면 None.
+    edges = {}
+    for row, (parent, itm) in enumerate(zip(parents, itms)):
+        edges.setdefault(parent, {}).setdefault(itm, row)
+
+    WHITE, GRAY, BLACK = 0, 1, 2
+    color = {}
+    for start in edges:
+        if color.get(start, WHITE) != WHITE:
+            continue
+        color[start] = GRAY
+        path = [start]
+        stack = [iter(edges[start].items())]
+        while stack:
+            for child, row in stack[-1]:
+                state = color.get(child, WHITE)
+                if state == GRAY:
+                    return path[path.index(child):] + [child], row
+                if state == WHITE:
+                    color[child] = GRAY
+                    path.append(child)
+                    stack.append(iter(edges.get(child, {}).items()))
+                    break
+            else:
+                color[path.pop()] = BLACK
+                stack.pop()
+    return None
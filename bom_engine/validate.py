@@ -0,0 +1,50 @@
+# ECO_BOM 입력 규칙 검사 (AddRowDialog 의 품번 / PREFIX / 수량 규칙을 컬럼 전체에 한 번에)
+# 행마다 re.match 를 부르지 않고 컬럼별 Series.str.fullmatch 한 번으로 검사한다.
+import re
+
+import numpy as np
+import pandas as pd
+
+from .revision import PART_RULES
+from .trace import traced
+
+# (컬럼, 정규식, 메시지) - 정규식은 값 전체가 맞아야 통과
+PART_NUMBER_PATTERN = "|".join("(?:%s)" % rule.pattern for rule in PART_RULES)
+RULES = [
+    ("ITM", PART_NUMBER_PATTERN, '품번 입력 규칙에 맞지 않습니다.'),
+    ("PREFIX", r'\d{4}', 'Prefix는 4자리 숫자만 입력 가능합니다.'),
+    ("QTY", r'\d+(?:\.\d+)?', '수량은 숫자만 입력 가능합니다.'),     # 엑셀에서 읽으면 1.0 처럼 실수로 올 수 있음
+]
+VIOLATION_COLUMNS = ["ROW", "COLUMN", "VALUE", "MESSAGE"]
+
+
+@traced("validate_bom")
+def validate_bom(df, rules=RULES):
+    # 규칙에 맞지 않는 셀 목록 (ROW 는 df 안의 행 위치, 행 순서대로)
+    parts = []
+    for column, pattern, message in rules:
+        if column not in df.columns:
+            continue
+        values = df[column].astype(str)
+        bad = ~values.str.fullmatch(pattern).to_numpy(dtype=bool)
+        rows = np.flatnonzero(bad)
+        if len(rows):
+            parts.append(pd.DataFrame({"ROW": rows, "COLUMN": column,
+                                       "VALUE": values.to_numpy(dtype=object)[rows], "MESSAGE": message}))
+    if not parts:
+        return pd.DataFrame({c: [] for c in VIOLATION_COLUMNS}).astype({"ROW": np.int64})
+    violations = pd.concat(parts, ignore_index=True)
+    return violations.sort_values("ROW", kind="stable").reset_index(drop=True)
+
+
+def violation_mask(violations, n_rows):
+    # 위반이 하나라도 있는 행 True
+    mask = np.zeros(n_rows, dtype=bool)
+    mask[violations["ROW"].to_numpy(dtype=np.int64)] = True
+    return mask
+
+
+def check_row(values, rules=RULES):
+    # 한 행 검사 (AddRowDialog): {컬럼: 값} -> 메시지 목록
+    return [message for column, pattern, message in rules
+            if column in values and re.fullmatch(pattern, str(values[column])) is None]
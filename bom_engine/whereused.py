@@ -0,0 +1,118 @@
+# 품번 단위 정/역전개 색인 (children-of / where-used)
+# 품번마다 번호를 매기고 상위 -> 하위, 하위 -> 상위 인접 목록을 둘 다 들고 있다.
+# 인접 목록은 {상대 품번 번호: 행 수} 라서 같은 관계가 여러 행에 있어도 마지막 행이 빠질 때만 관계가 없어진다.
+# BomGraph listener 로 붙어 노드 추가/삭제/이동/품번 변경 때마다 바로 갱신한다 (트리 전체를 다시 훑지 않음).
+
+
+class WhereUsedIndex:
+    def __init__(self, graph):
+        self.graph = graph
+        self.ids = {}           # 품번 -> 번호
+        self.names = []         # 번호 -> 품번
+        self.parents = []       # 번호 -> {상위 품번 번호: 행 수}
+        self.children = []      # 번호 -> {하위 품번 번호: 행 수}
+        for nid, _ in graph.walk():
+            self.node_added(nid)
+        graph.listeners.append(self)
+
+    def part_id(self, name):
+        pid = self.ids.get(name)
+        if pid is None:
+            pid = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.parents.append({})
+            self.children.append({})
+        return pid
+
+    def parents_of(self, name):
+        # 바로 위 상위 품번 (한 단계)
+        pid = self.ids.get(name)
+        return [] if pid is None else [self.names[p] for p in self.parents[pid]]
+
+    def children_of(self, name):
+        pid = self.ids.get(name)
+        return [] if pid is None else [self.names[c] for c in self.children[pid]]
+
+    def where_used(self, name, max_level=None):
+        # 여러 단계 역전개: [(상위 품번, 단계)] 가까운 단계부터, 품번마다 한 번
+        return self._expand(name, self.parents, max_level)
+
+    def explode(self, name, max_level=None):
+        # 여러 단계 정전개: [(하위 품번, 단계)]
+        return self._expand(name, self.children, max_level)
+
+    def top_assemblies(self, name):
+        # name 을 쓰는 최상위 품번 (더 위 상위가 없는 품번)
+        return [part for part, _ in self.where_used(name) if not self.parents[self.ids[part]]]
+
+    def _expand(self, name, adjacency, max_level):
+        pid = self.ids.get(name)
+        if pid is None:
+            return []
+        seen = {pid}
+        level_parts = [pid]
+        result = []
+        level = 0
+        while level_parts and (max_level is None or level < max_level):
+            level += 1
+            next_parts = []
+            for part in level_parts:
+                for other in adjacency[part]:
+                    if other not in seen:
+                        seen.add(other)
+                        next_parts.append(other)
+                        result.append((self.names[other], level))
+            level_parts = next_parts
+        return result
+
+    def _link(self, parent_name, name, count=1):
+        p, c = self.part_id(parent_name), self.part_id(name)
+        _bump(self.children[p], c, count)
+        _bump(self.parents[c], p, count)
+
+    # BomGraph listener
+    def node_added(self, nid):
+        graph = self.graph
+        parent = graph.parent[nid]
+        if parent >= 0:
+            self._link(graph.columns[0][parent], graph.columns[0][nid])
+        else:
+            self.part_id(graph.columns[0][nid])
+
+    def node_removed(self, nid):
+        graph = self.graph
+        parent = graph.parent[nid]
+        if parent >= 0:
+            self._link(graph.columns[0][parent], graph.columns[0][nid], -1)
+
+    def node_moved(self, nid, old_parent):
+        graph = self.graph
+        name = graph.columns[0][nid]
+        if old_parent >= 0:
+            self._link(graph.columns[0][old_parent], name, -1)
+        self.node_added(nid)
+
+    def value_changed(self, nid, col, old, new):
+        # 품번 변경: nid 가 하위인 관계와 상위인 관계를 새 품번으로 옮긴다 (트리에서 빠진 노드는 무시)
+        graph = self.graph
+        if col != 0 or old == new or not graph.attached(nid):
+            return
+        parent = graph.parent[nid]
+        if parent >= 0:
+            parent_name = graph.columns[0][parent]
+            self._link(parent_name, old, -1)
+            self._link(parent_name, new)
+        else:
+            self.part_id(new)
+        for child in graph.children[nid]:
+            child_name = graph.columns[0][child]
+            self._link(old, child_name, -1)
+            self._link(new, child_name)
+
+
+def _bump(counts, key, count):
+    value = counts.get(key, 0) + count
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
@@ -1,18 +1,31 @@
 import os
 import sys
 
+import numpy as np
 import pandas as pd
 
-from PySide6.QtCore import Qt, QCoreApplication, QItemSelectionModel
+from PySide6.QtCore import (Qt, QCoreApplication, QItemSelection, QItemSelectionModel, QAbstractTableModel,
+                            QAbstractItemModel, QModelIndex, QObject, QRunnable, QThreadPool, Signal)
 from PySide6.QtWidgets import (QApplication, QFileDialog, QHeaderView, QHBoxLayout, 
-                               QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, 
-                               QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget,
+                               QLineEdit, QPushButton, QTableView, 
+                               QTreeView, QVBoxLayout, QWidget,
                                QDialog, QDialogButtonBox, QFormLayout, QLabel, QVBoxLayout, 
-                               QLineEdit, QLabel, QTabWidget, QMessageBox)
-from PySide6.QtGui import QColor
-from PySide6 import QtGui
-import string
-import re
+                               QLineEdit, QLabel, QTabWidget, QMessageBox, QComboBox, QProgressBar,
+                               QAbstractItemView, QCheckBox)
+from PySide6.QtGui import QColor, QKeySequence, QUndoCommand, QUndoStack
+
+from bom_engine import (BomGraph, BomBuilder, STATUS_UNCHANGED, STATUS_ADDED, STATUS_CHANGED, STATUS_DELETED,
+                        BomCycleError, change_node_name)
+from bom_engine import eco
+from bom_engine import diff
+from bom_engine.cache import BomCache
+from bom_engine.export import tree_to_dataframe, write_bom_xlsx
+from bom_engine.loader import EcoWorkbook
+from bom_engine.rollup import rollup_table
+from bom_engine.search import SEARCH_FIELDS, SearchIndex
+from bom_engine.trace import TRACER, span, traced
+from bom_engine.whereused import WhereUsedIndex
+from bom_engine.validate import check_row, validate_bom, violation_mask
 
 QCoreApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
 
@@ -40,77 +53,564 @@ TO DO LIST
 21. 리턴 버튼 추가
 
 '''
-def tree_to_dataframe(tree_widget):
-    data = []
-    
-    def visit_node(node, parent=None, level=0):
-        if parent is not None:
-            row = [level, parent]
-            row.append(node.text(1))  # Add PREFIX
-
-            # Add text and background color for each column
-            for j in range(tree_widget.columnCount()):
-                bg_color = node.background(j).color()
-                if bg_color.isValid():  # Check if the background color is valid
-                    if bg_color == QColor.fromRgbF(0, 0, 0, 1):  # Check if the background color is black
-                        row.append({'text': node.text(j), 'bg_color': Qt.white})  # Use white as the background color
-                    else:
-                        row.append({'text': node.text(j), 'bg_color': bg_color})
-                else:
-                    row.append({'text': node.text(j), 'bg_color': Qt.white})  # Use white as the default background color
-                
-            row.pop(4)  # Remove CLASS for ITM
-            data.append(row)
-
-        for i in range(node.childCount()):
-            visit_node(node.child(i), node.text(0), level + 1)
-
-    for i in range(tree_widget.topLevelItemCount()):
-        item = tree_widget.topLevelItem(i)
-        visit_node(item)
-
-    columns = ["LVL", "PARENT", "PREFIX", "ITM", "ITM_DESC", "QTY", "UOM", "SRC", "PROC", "THREAD"]
-    df = pd.DataFrame(data, columns=columns)
-    return df
-
-# class MyTreeWidgetItem(QTreeWidgetItem):
-#     def __init__(self, parent=None):
-#         super(MyTreeWidgetItem, self).__init__(parent)
+# 이 행 수 이하일 때만 Tree 전체 펼치기
+TREE_EXPAND_ALL_LIMIT = 5000
+
+# 컬럼 폭 자동 조절 시 확인할 행 수 (전체 행 대신 샘플)
+RESIZE_SAMPLE_ROWS = 200
+
+# 입력 규칙 위반 행 배경색 (bom_engine.validate)
+VIOLATION_COLOR = QColor(255, 200, 120)
+
+# data() 는 셀마다 여러 번 불리므로 Qt enum 속성 조회를 미리 해 둔다
+DISPLAY_ROLE = Qt.DisplayRole
+EDIT_ROLE = Qt.EditRole
+BACKGROUND_ROLE = Qt.BackgroundRole
+
+
+class WorkerSignals(QObject):
+    progress = Signal(int, str)         # 진행률(%) - 모르면 -1, 메시지
+    chunk = Signal(object, object)      # (worker, 중간 결과) - 스트리밍 로드
+    finished = Signal(object, object)   # (worker, 결과)
+    failed = Signal(object, object)     # (worker, 예외)
+
+
+class Worker(QRunnable):
+    # job(worker) 를 QThreadPool 에서 실행 (GUI 스레드가 멈추지 않도록)
+    # job 안에서 worker.report(...) 로 진행 상황을 알리고, 단계 사이에 worker.cancelled 를 확인한다.
+    # 취소된 작업의 결과는 버린다.
+    def __init__(self, job, name='job'):
+        super(Worker, self).__init__()
+        self.job = job
+        self.name = name
+        self.signals = WorkerSignals()
+        self.cancelled = False
+
+    def report(self, message, percent=-1):
+        if not self.cancelled:
+            self.signals.progress.emit(percent, message)
+
+    def emit_chunk(self, data):
+        # 취소되면 예외로 작업을 멈춘다 (run() 에서 취소된 작업의 예외는 무시)
+        if self.cancelled:
+            raise RuntimeError('cancelled')
+        self.signals.chunk.emit(self, data)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            with span(self.name, cat='worker'):
+                result = self.job(self)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.failed.emit(self, e)
+        else:
+            if not self.cancelled:
+                self.signals.finished.emit(self, result)
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    # DataFrame 를 그대로 보여주는 테이블 모델 (셀마다 QTableWidgetItem 을 만들지 않음)
+    # 컬럼별 numpy 배열만 들고 있다가 뷰가 요청한 셀만 data() 에서 문자열로 변환한다.
+
+    def __init__(self, df=None, parent=None):
+        super(DataFrameTableModel, self).__init__(parent)
+        self.set_dataframe(df if df is not None else pd.DataFrame())
+
+    def set_dataframe(self, df, row_colors=None):
+        # row_colors: 행별 배경색 (QColor 또는 None) 목록
+        self.beginResetModel()
+        self._df = df
+        self._chunks = None
+        self._row_colors = row_colors
+        self._headers = [str(c) for c in df.columns]
+        self._columns = [df.iloc[:, c].to_numpy() for c in range(df.shape[1])]
+        self._row_count = df.shape[0]
+        self.endResetModel()
+
+    def append_dataframe(self, df):
+        # 스트리밍 로드: 청크를 아래에 이어 붙인다 (기존 행은 다시 그리지 않음)
+        # 컬럼 배열은 모자랄 때 두 배로 늘리고, DataFrame 은 청크 목록으로 두었다가 dataframe() 에서 한 번만 이어 붙인다
+        if self._row_count == 0:
+            self.set_dataframe(df)
+            return
+        first = self._row_count
+        last = first + len(df)
+        self.beginInsertRows(QModelIndex(), first, last - 1)
+        if self._chunks is None:
+            self._chunks = [self._df]
+        self._chunks.append(df)
+        for c, column in enumerate(self._columns):
+            if last > len(column):
+                grown = np.empty(max(last, 2 * len(column)), dtype=object)
+                grown[:first] = column[:first]
+                self._columns[c] = column = grown
+            column[first:last] = df.iloc[:, c].to_numpy()
+        self._row_count = last
+        self.endInsertRows()
+
+    def replace_dataframe(self, df):
+        # 같은 행, 같은 컬럼의 다른 DataFrame 으로 저장소만 바꾼다 (스트리밍이 끝난 뒤 category 로 정리된 전체 표)
+        # 보이는 값은 그대로이므로 모델을 리셋하지 않는다 (스크롤, 선택 유지)
+        if df.shape != (self._row_count, len(self._columns)):
+            self.set_dataframe(df, self._row_colors)
+            return
+        self._df = df
+        self._chunks = None
+        self._columns = [df.iloc[:, c].to_numpy() for c in range(df.shape[1])]
+        self._row_count = df.shape[0]
+
+    def set_row_colors(self, row_colors):
+        # 데이터는 그대로 두고 배경색만 바꾼다
+        self._row_colors = row_colors
+        if self._row_count:
+            self.dataChanged.emit(self.index(0, 0), self.index(self._row_count - 1, len(self._columns) - 1),
+                                  [BACKGROUND_ROLE])
+
+    def dataframe(self):
+        if self._chunks is not None:
+            self._df = pd.concat(self._chunks)
+            self._chunks = None
+        return self._df
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index, role=DISPLAY_ROLE):
+        if role == DISPLAY_ROLE:
+            return str(self._columns[index.column()][index.row()])
+        if role == BACKGROUND_ROLE and self._row_colors is not None:
+            return self._row_colors[index.row()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._headers[section]
+        return str(section + 1)
+
+class BomTreeModel(QAbstractItemModel):
+    # BomGraph 를 그대로 보여주는 트리 모델
+    # QModelIndex 의 internalId 에 노드 id 를 넣고, 뷰가 요청한 행만 data() 로 꺼낸다.
+    STATUS_COLORS = {
+        STATUS_ADDED: QColor(255, 255, 0),
+        STATUS_CHANGED: QColor("red"),
+        STATUS_DELETED: QColor(192, 192, 192),
+    }
+
+    def __init__(self, graph=None, parent=None):
+        super(BomTreeModel, self).__init__(parent)
+        self.graph = graph if graph is not None else BomGraph()
+        self.search_index = SearchIndex(self.graph)
+        self.where_used = WhereUsedIndex(self.graph)
+
+    def set_graph(self, graph):
+        self.beginResetModel()
+        self.graph = graph
+        self.search_index = SearchIndex(graph)
+        self.search_index.rebuild()
+        self.where_used = WhereUsedIndex(graph)
+        self.endResetModel()
+
+    def node(self, index):
+        return index.internalId() if index.isValid() else -1
+
+    def index_of(self, nid, column=0):
+        if nid < 0:
+            return QModelIndex()
+        return self.createIndex(self.graph.row[nid], column, nid)
+
+    def index(self, row, column, parent=QModelIndex()):
+        sibs = self.graph.siblings(self.node(parent))
+        if 0 <= row < len(sibs) and 0 <= column < len(BomGraph.COLUMNS):
+            return self.createIndex(row, column, sibs[row])
+        return QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self.index_of(self.graph.parent[index.internalId()])
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.graph.siblings(self.node(parent)))
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(BomGraph.COLUMNS)
+
+    def data(self, index, role=DISPLAY_ROLE):
+        if role == DISPLAY_ROLE or role == EDIT_ROLE:
+            return self.graph.value(index.internalId(), index.column())
+        if role == BACKGROUND_ROLE:
+            return self.STATUS_COLORS.get(self.graph.status[index.internalId()])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return BomGraph.COLUMNS[section]
+        return None
+
+    # 편집 (그래프 변경 + 뷰 알림)
+    def insert_node(self, parent, pos, values, status=STATUS_UNCHANGED):
+        self.beginInsertRows(self.index_of(parent), pos, pos)
+        nid = self.graph.add_node(parent, values, status, pos)
+        self.endInsertRows()
+        return nid
+
+    def append_rows(self, builder, df):
+        # 스트리밍 로드: 청크의 행을 트리에 붙인다 (builder 는 이 모델 graph 의 BomBuilder)
+        # 이미 보이는 노드(또는 최상위) 아래에 붙는 노드만 행 추가를 알리고,
+        # 이번 청크에서 새로 생긴 노드의 자식은 뷰가 아직 펼친 적이 없으므로 그냥 붙인다.
+        first_new = len(self.graph)
+
+        def add_node(parent, values):
+            if parent >= first_new:
+                return self.graph.add_node(parent, values)
+            return self.insert_node(parent, len(self.graph.siblings(parent)), values)
+
+        builder.append(df, add_node)
+
+    def remove_node(self, nid):
+        pos = self.graph.row[nid]
+        self.beginRemoveRows(self.index_of(self.graph.parent[nid]), pos, pos)
+        self.graph.detach(nid)
+        self.endRemoveRows()
+        return pos
+
+    def attach_node(self, nid, parent, pos):
+        # remove_node 로 뺀 노드(서브트리 포함)를 다시 붙인다 (되돌리기)
+        self.beginInsertRows(self.index_of(parent), pos, pos)
+        self.graph.attach(nid, parent, pos)
+        self.endInsertRows()
+
+    # 여러 행 편집은 행 묶음마다 begin/end 한 번 (뷰는 한 번만 다시 그림)
+    def move_rows(self, parent, first, count, pos):
+        # 형제 first ~ first + count - 1 을 첫 행이 pos 에 오도록 옮긴다
+        parent_index = self.index_of(parent)
+        dest = pos + count if pos > first else pos   # beginMoveRows 는 이동 전 기준 위치
+        if not self.beginMoveRows(parent_index, first, first + count - 1, parent_index, dest):
+            return False
+        self.graph.move_range(parent, first, count, pos)
+        self.endMoveRows()
+        return True
+
+    def remove_rows(self, parent, first, count):
+        self.beginRemoveRows(self.index_of(parent), first, first + count - 1)
+        nodes = self.graph.detach_range(parent, first, count)
+        self.endRemoveRows()
+        return nodes
+
+    def insert_rows(self, nodes, parent, pos):
+        # remove_rows 로 뺀 노드를 다시 붙인다 (되돌리기)
+        self.beginInsertRows(self.index_of(parent), pos, pos + len(nodes) - 1)
+        self.graph.attach_range(nodes, parent, pos)
+        self.endInsertRows()
+
+    def remove_row_runs(self, runs):
+        # 여기저기 흩어진 묶음 (parent, first, count) 여러 개 삭제. runs 는 같은 상위 안에서 아래 묶음부터.
+        # 묶음마다 beginRemoveRows 를 하면 뷰가 매번 펼친 행 전체를 다시 확인하므로 layoutChanged 한 번으로 처리
+        if len(runs) == 1:
+            return [self.remove_rows(*runs[0])]
+        return self._change_layout(lambda: [self.graph.detach_range(*run) for run in runs])
+
+    def insert_row_runs(self, runs, removed):
+        # remove_row_runs 되돌리기 (역순으로 다시 붙인다)
+        if len(runs) == 1:
+            self.insert_rows(removed[0], runs[0][0], runs[0][1])
+            return
+        self._change_layout(lambda: [self.graph.attach_range(nodes, parent, first)
+                                     for (parent, first, _), nodes in reversed(list(zip(runs, removed)))])
+
+    def _change_layout(self, change):
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        nodes = [(index.internalId(), index.column()) for index in persistent]
+        result = change()
+        graph = self.graph
+        self.changePersistentIndexList(persistent, [self.index_of(nid, col) if graph.attached(nid) else QModelIndex()
+                                                    for nid, col in nodes])
+        self.layoutChanged.emit()
+        return result
 
-class MyTreeWidget(QTreeWidget):
+    def reparent_rows(self, old_parent, first, count, parent, pos):
+        # 형제 묶음을 다른 상위 품번 아래로 (순환이 생기면 BomCycleError, 모델은 그대로)
+        graph = self.graph
+        for nid in graph.siblings(old_parent)[first:first + count]:
+            graph.check_reparent(nid, parent)
+        if not self.beginMoveRows(self.index_of(old_parent), first, first + count - 1, self.index_of(parent), pos):
+            return False
+        graph.reparent_range(old_parent, first, count, parent, pos)
+        self.endMoveRows()
+        return True
+
+    def set_value(self, nid, col, value):
+        self.graph.set_value(nid, col, value)
+        index = self.index_of(nid, col)
+        self.dataChanged.emit(index, index)
+
+    def set_values(self, nid, values):
+        for col, value in enumerate(values):
+            self.graph.set_value(nid, col, value)
+        self.dataChanged.emit(self.index_of(nid, 0), self.index_of(nid, len(BomGraph.COLUMNS) - 1))
+
+    def refresh_nodes(self, nodes):
+        # 엔진에서 직접 바꾼 노드 다시 그리기
+        last = len(BomGraph.COLUMNS) - 1
+        for nid in set(nodes):
+            self.dataChanged.emit(self.index_of(nid, 0), self.index_of(nid, last))
+
+    def set_status(self, nid, status):
+        self.graph.status[nid] = status
+        self.dataChanged.emit(self.index_of(nid, 0), self.index_of(nid, len(BomGraph.COLUMNS) - 1),
+                              [Qt.BackgroundRole])
+
+
+# 트리 편집 되돌리기 (QUndoStack)
+# 트리 전체를 복사하지 않고 편집마다 바뀐 부분(노드 id, 위치, 이전 값)만 저장한다.
+# 삭제는 노드를 분리만 하므로(BomGraph.detach) 되돌릴 때 그대로 다시 붙인다.
+# 여러 행을 한 번에 바꾸는 작업은 명령 하나로 되돌린다.
+
+class InsertNodeCommand(QUndoCommand):
+    def __init__(self, model, parent, pos, values, status):
+        super(InsertNodeCommand, self).__init__('품번 추가')
+        self.model, self.parent, self.pos = model, parent, pos
+        self.values, self.status = values, status
+        self.nid = -1
+
+    def redo(self):
+        if self.nid < 0:
+            self.nid = self.model.insert_node(self.parent, self.pos, self.values, self.status)
+        else:
+            self.model.attach_node(self.nid, self.parent, self.pos)
+
+    def undo(self):
+        self.model.remove_node(self.nid)
+
+
+class MoveRowsCommand(QUndoCommand):
+    MERGE_ID = 1
+
+    def __init__(self, model, parent, first, count, pos):
+        super(MoveRowsCommand, self).__init__('행 이동')
+        self.model, self.parent, self.count = model, parent, count
+        self.nid = model.graph.siblings(parent)[first]     # 묶음의 첫 노드 (병합 확인용)
+        self.old_pos, self.new_pos = first, pos
+
+    def id(self):
+        return self.MERGE_ID
+
+    def mergeWith(self, other):
+        # 같은 행 묶음을 연속으로 Move Up/Down 하면 한 번에 되돌린다 (제자리로 돌아오면 기록을 지운다)
+        if other.nid != self.nid or other.count != self.count:
+            return False
+        self.new_pos = other.new_pos
+        self.setObsolete(self.new_pos == self.old_pos)
+        return True
+
+    def redo(self):
+        self.model.move_rows(self.parent, self.old_pos, self.count, self.new_pos)
+
+    def undo(self):
+        self.model.move_rows(self.parent, self.new_pos, self.count, self.old_pos)
+
+
+class RemoveRowsCommand(QUndoCommand):
+    # runs: 삭제할 형제 묶음 (parent, first, count) 목록 - 같은 상위 안에서는 아래 묶음부터
+    def __init__(self, model, runs):
+        super(RemoveRowsCommand, self).__init__('행 삭제')
+        self.model, self.runs = model, runs
+        self.removed = None
+
+    def redo(self):
+        self.removed = self.model.remove_row_runs(self.runs)
+
+    def undo(self):
+        self.model.insert_row_runs(self.runs, self.removed)
+
+
+class ReparentRowsCommand(QUndoCommand):
+    def __init__(self, model, old_parent, first, count, parent, pos):
+        super(ReparentRowsCommand, self).__init__('상위 품번 변경')
+        self.model, self.count = model, count
+        self.old_parent, self.first = old_parent, first
+        self.parent, self.pos = parent, pos
+
+    def redo(self):
+        self.model.reparent_rows(self.old_parent, self.first, self.count, self.parent, self.pos)
+
+    def undo(self):
+        self.model.reparent_rows(self.parent, self.pos, self.count, self.old_parent, self.first)
+
+
+class SetStatusCommand(QUndoCommand):
+    def __init__(self, model, nodes, status):
+        super(SetStatusCommand, self).__init__('상태 변경')
+        self.model, self.nodes, self.status = model, nodes, status
+        self.old_status = bytes(model.graph.status[nid] for nid in nodes)
+
+    def redo(self):
+        for nid in self.nodes:
+            self.model.set_status(nid, self.status)
+
+    def undo(self):
+        for nid, status in zip(self.nodes, self.old_status):
+            self.model.set_status(nid, status)
+
+
+class SetValuesCommand(QUndoCommand):
+    def __init__(self, model, nid, values):
+        super(SetValuesCommand, self).__init__('속성 변경')
+        self.model, self.nid = model, nid
+        graph = model.graph
+        self.changes = [(col, graph.value(nid, col), value) for col, value in enumerate(values)
+                        if graph.value(nid, col) != value]
+
+    def redo(self):
+        for col, _, new in self.changes:
+            self.model.set_value(self.nid, col, new)
+
+    def undo(self):
+        for col, old, _ in self.changes:
+            self.model.set_value(self.nid, col, old)
+
+
+class RenameCommand(QUndoCommand):
+    # 품번 변경 + 상위 첨자 변경. 처음 실행할 때 엔진이 남긴 EcoLog 변경분만 보관한다.
+    def __init__(self, model, log, old_name, new_name, name_lists):
+        super(RenameCommand, self).__init__('품번 변경 %s -> %s' % (old_name, new_name))
+        self.model, self.log = model, log
+        self.old_name, self.new_name = old_name, new_name
+        self.name_lists = name_lists    # 창의 (old_names, updated_names)
+        self.changes = self.statuses = self.bumped = None
+        self.renamed = None     # 실제로 이름이 바뀐 노드 (첨자 예외 품번은 로그에만 남음)
+
+    def redo(self):
+        log, graph = self.log, self.model.graph
+        if self.changes is None:
+            changes, statuses, bumped = len(log.changes), len(log.statuses), set(log.bumped)
+            change_node_name(graph, self.old_name, self.new_name, log)
+            self.changes = log.changes[changes:]
+            self.statuses = log.statuses[statuses:]
+            self.bumped = log.bumped - bumped
+            self.renamed = [(nid, old, new) for nid, old, new in self.changes if graph.value(nid, 0) == new]
+        else:
+            for nid, _, new in self.renamed:
+                graph.set_value(nid, 0, new)
+            for nid, _ in self.statuses:
+                graph.status[nid] = STATUS_CHANGED
+            log.changes.extend(self.changes)
+            log.statuses.extend(self.statuses)
+            log.bumped |= self.bumped
+        self.model.refresh_nodes([nid for nid, _, _ in self.changes])
+        old_names, updated_names = self.name_lists
+        old_names.extend(old for _, old, _ in self.changes)
+        updated_names.extend(new for _, _, new in self.changes)
+
+    def undo(self):
+        log, graph = self.log, self.model.graph
+        for nid, old, _ in reversed(self.renamed):
+            graph.set_value(nid, 0, old)
+        for nid, status in reversed(self.statuses):
+            graph.status[nid] = status
+        del log.changes[len(log.changes) - len(self.changes):]
+        del log.statuses[len(log.statuses) - len(self.statuses):]
+        log.bumped -= self.bumped
+        self.model.refresh_nodes([nid for nid, _, _ in self.changes])
+        for names in self.name_lists:
+            del names[len(names) - len(self.changes):]
+
+
+class MyTreeView(QTreeView):
      
     def __init__(self, parent=None):
-        super(MyTreeWidget, self).__init__(parent)
+        super(MyTreeView, self).__init__(parent)
 
-        self.setHeaderLabels(["CLASS", "PREFIX", "ITM_DESC", "QTY", "UOM", "SRC", "PROC", "THREAD"])
         self.setAlternatingRowColors(True)
+        self.setUniformRowHeights(True)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)     # Shift/Ctrl 로 여러 행 선택
         self.header().setSectionResizeMode(QHeaderView.Interactive)
-        self.itemClicked.connect(self.item_clicked)
-
-    def do_search(self, term):
-        clist = self.findItems(term, Qt.MatchContains | Qt.MatchRecursive)
-
+        self.clicked.connect(self.item_clicked)
+
+    def do_search(self, term, fields=None):
+        return self.select_nodes(self.model().search_index.search(term, fields))
+
+    def select_nodes(self, nodes):
+        # 노드를 같은 부모 안 연속 행끼리 묶어 QItemSelection 하나로 한 번에 선택
+        model = self.model()
+        graph = model.graph
+
+        selection = QItemSelection()
+        last = model.columnCount() - 1
+        nodes.sort(key=lambda nid: (graph.parent[nid], graph.row[nid]))
+        start = 0
+        for i in range(1, len(nodes) + 1):
+            if i == len(nodes) or graph.parent[nodes[i]] != graph.parent[nodes[start]] \
+                    or graph.row[nodes[i]] != graph.row[nodes[i - 1]] + 1:
+                selection.select(model.index_of(nodes[start]), model.index_of(nodes[i - 1], last))
+                start = i
+
+        # 범위를 이미 행 전체로 만들었으므로 Rows 플래그는 쓰지 않는다 (Rows 는 범위마다 다시 펼쳐서 느림).
+        # ClearAndSelect 는 이전 선택과 범위 비교를 하므로 먼저 비우고 선택한다.
         sel = self.selectionModel()
-        for item in clist:
-            index = self.indexFromItem(item)
-            sel.select(index, QItemSelectionModel.Select)
-        
-    def set_item_background_color(self, item, color):
-        for i in range(self.columnCount()):
-            item.setBackground(i, color)
-
-    def item_clicked(self, item, column):
-       self.parent().load_item_properties(item)
+        sel.clearSelection()
+        sel.select(selection, QItemSelectionModel.Select)
+        if nodes:
+            self.scrollTo(model.index_of(nodes[0]))
+        return nodes
+
+    def fit_columns(self, sample=200, max_width=400):
+        # 전체 행 resizeColumnToContents 대신 일부 행만 샘플링해서 컬럼 폭 추정
+        graph = self.model().graph
+        if len(graph) == 0:
+            return
+        fm = self.fontMetrics()
+        pad = 2 * fm.horizontalAdvance('M')
+        nodes = range(0, len(graph), max(1, len(graph) // sample))
+        header = self.header()
+
+        for c, label in enumerate(BomGraph.COLUMNS):
+            width = fm.horizontalAdvance(label)
+            for nid in nodes:
+                w = fm.horizontalAdvance(graph.value(nid, c))
+                if c == 0:
+                    w += self.indentation() * (graph.depth(nid) + 1)
+                width = max(width, w)
+            header.resizeSection(c, min(width + pad, max_width))
+
+    def item_clicked(self, index):
+       self.parent().load_item_properties(index)
 
 class DataFrameDialog(QDialog):
+    # 비교 결과 색상 (추가: 노랑, 변경: 빨강, 삭제: 회색, 이동: 하늘색)
+    DIFF_COLORS = {
+        diff.ADDED: QColor(255, 255, 0),
+        diff.CHANGED: QColor("red"),
+        diff.REMOVED: QColor(192, 192, 192),
+        diff.MOVED: QColor(135, 206, 235),
+    }
+
     def __init__(self, parent=None):
         super(DataFrameDialog, self).__init__(parent)
 
         self.setWindowTitle('BOM Comparison')
         self.setWindowFlags(self.windowFlags() | Qt.WindowMaximizeButtonHint)  # Add maximize button to the dialog
 
-        self.left_table = QTableWidget()
-        self.right_table = QTableWidget()
+        self.left_table = QTableView()
+        self.right_table = QTableView()
+        self.left_model = DataFrameTableModel(parent=self)
+        self.right_model = DataFrameTableModel(parent=self)
+        self.left_table.setModel(self.left_model)
+        self.right_table.setModel(self.right_model)
+        for table in (self.left_table, self.right_table):
+            table.horizontalHeader().setResizeContentsPrecision(RESIZE_SAMPLE_ROWS)
+        self.summary_label = QLabel()
 
         layout = QVBoxLayout()
 
@@ -130,46 +630,44 @@ class DataFrameDialog(QDialog):
         table_layout.addWidget(self.left_table)
         table_layout.addWidget(self.right_table)
         layout.addLayout(table_layout)
+        layout.addWidget(self.summary_label)
         self.setLayout(layout)
 
-    def show_dataframes(self, old_df, new_df):
-        self.show_dataframe(self.left_table, old_df)
-        self.show_dataframe(self.right_table, new_df)
-        self.compare_and_highlight_differences(old_df, new_df)
-        self.sync_table_scrollbars()
-        self.show()
-
-    def show_dataframe(self, table, df):
-        table.setRowCount(df.shape[0])
-        table.setColumnCount(df.shape[1])
-        table.setHorizontalHeaderLabels(df.columns)
-
-        for i in range(df.shape[0]):
-            for j in range(df.shape[1]):
-                cell_data = df.iat[i, j]
-                if isinstance(cell_data, dict):  # Check if cell_data is a dictionary
-                    item = QTableWidgetItem(cell_data['text'])
-                    item.setBackground(cell_data['bg_color'])
-                else:
-                    item = QTableWidgetItem(str(cell_data))                    
-                table.setItem(i, j, item)
-
-    def compare_and_highlight_differences(self, old_df, new_df):
-        # Create a set of row labels for each dataframe
-        old_row_labels = set(old_df.index)
-        new_row_labels = set(new_df.index)
-
-        # Find missing rows in old_df
-        missing_rows = new_row_labels - old_row_labels
-
-        # Insert missing rows into the old_df table with a blue background
-        for row_label in missing_rows:
-            new_row_index = new_df.index.get_loc(row_label)
-            self.left_table.insertRow(new_row_index)
-            for j in range(old_df.shape[1]):
-                item = QTableWidgetItem("")
-                item.setBackground(Qt.yellow)
-                self.left_table.setItem(new_row_index, j, item)
+    @staticmethod
+    def compare(old_df, new_df):
+        # (PARENT, ITM, PREFIX) 키로 비교한 뒤 양쪽 행을 맞춘다 (Qt 객체를 쓰지 않으므로 작업 스레드에서 실행 가능)
+        result = diff.diff_boms(old_df, new_df)
+        old_idx, new_idx, kinds = diff.align(result)
+
+        # NEW 쪽 STATUS(트리에서 표시한 추가/변경/삭제)는 배경색으로만 사용
+        status = new_df["STATUS"].to_numpy() if "STATUS" in new_df.columns else None
+        new_df = new_df.drop(columns="STATUS", errors="ignore")
+        right_status = None
+        if status is not None:
+            same = (kinds == diff.SAME) & (new_idx >= 0)
+            right_status = np.where(same, status[new_idx.clip(0)] if len(status) else 0, -1)
+
+        return {"diff": result, "kinds": kinds, "right_status": right_status,
+                "old": diff.aligned_frame(old_df, old_idx), "new": diff.aligned_frame(new_df, new_idx)}
+
+    @traced()
+    def show_comparison(self, comparison):
+        kinds = comparison["kinds"]
+        row_colors = [self.DIFF_COLORS.get(kind) for kind in kinds]
+        right_colors = list(row_colors)
+        if comparison["right_status"] is not None:
+            status_colors = BomTreeModel.STATUS_COLORS
+            for i in np.flatnonzero(comparison["right_status"] >= 0):
+                right_colors[i] = status_colors.get(int(comparison["right_status"][i]))
+
+        self.left_model.set_dataframe(comparison["old"], row_colors)
+        self.right_model.set_dataframe(comparison["new"], right_colors)
+        self.left_table.resizeColumnsToContents()
+        self.right_table.resizeColumnsToContents()
+
+        counts = diff.summary(comparison["diff"])
+        self.summary_label.setText("  ".join("%s: %d" % (kind, counts.get(kind, 0))
+                                             for kind in [diff.ADDED, diff.REMOVED, diff.CHANGED, diff.MOVED]))
                 
     def sync_table_scrollbars(self):
         def sync_scrollbars(value):
@@ -221,19 +719,9 @@ class AddRowDialog(QDialog):
 
     ## 신규품번 추가 입력 오류 검출_김영진 
     def add_error_check(self):
-        error_messages = []
-        # Class 입력 규칙 검사
-        rule1 = r'^\d{6}-\d{5}[A-Za-z]?$|\d{6}-\d{5}[A-Za-z]?-(M|m)$'   #6자리 숫자 다음에 + '-'+ 5자리 숫자 + 첨자 + m(소재품번?)
-        rule2 = r'^S\d{7}$'                                             #S + 7자리
-        rule3 = r'^R\d{5,6}[a-zA-Z]?$'                                  #R + 5, 6자리 + 첨자
-        if not re.match(rule1, self.class_edit.text()) and not re.match(rule2, self.class_edit.text()) and not re.match(rule3, self.class_edit.text()):
-            error_messages.append('품번 입력 규칙에 맞지 않습니다.')
-        #Prefix 입력 규칙 검사
-        if not self.prefix_edit.text().isdigit() or len(self.prefix_edit.text()) != 4:
-            error_messages.append('Prefix는 4자리 숫자만 입력 가능합니다.')
-        #수량 입력 규칙 검사
-        if not self.qty_edit.text().isdigit():
-            error_messages.append('수량은 숫자만 입력 가능합니다.')
+        # 품번 / Prefix / 수량 입력 규칙 검사 (엑셀을 읽을 때 검사하는 규칙과 같음: bom_engine.validate.RULES)
+        error_messages = check_row({"ITM": self.class_edit.text(), "PREFIX": self.prefix_edit.text(),
+                                    "QTY": self.qty_edit.text()})
         # 에러메시지
         error_message = '\n'.join(error_messages)
         # 알림창 띄우기
@@ -293,6 +781,141 @@ class ItemNameInformer(QDialog):
         
         self.setLayout(hbox)
     
+class ViolationDialog(QDialog):
+    # 입력 규칙 위반 목록 (행을 더블클릭하면 메인 테이블의 그 행으로 이동)
+    def __init__(self, violations, table, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("입력 규칙 위반 %d건" % len(violations))
+        self.violations = violations
+        self.main_table = table
+
+        shown = violations.assign(ROW=violations["ROW"] + 1)     # 메인 테이블 행 번호와 맞춘다
+        self.view = QTableView()
+        self.view.setModel(DataFrameTableModel(shown, parent=self))
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.resizeColumnsToContents()
+        self.view.doubleClicked.connect(self.go_to_row)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.view)
+        self.setLayout(layout)
+        self.resize(600, 400)
+
+    def go_to_row(self, index):
+        row = int(self.violations["ROW"].iat[index.row()])
+        self.main_table.selectRow(row)
+        self.main_table.scrollTo(self.main_table.model().index(row, 0), QAbstractItemView.PositionAtCenter)
+
+
+class RollupDialog(QDialog):
+    # 품번별 총소요량 (bom_engine.rollup), 체크하면 LEAF(하위 구성이 없는) 품번만
+    def __init__(self, table, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("소요량 집계")
+        self.rollup = table
+
+        self.leaf_check = QCheckBox("LEAF 품번만")
+        self.model = DataFrameTableModel(table, parent=self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+        self.view.horizontalHeader().setResizeContentsPrecision(RESIZE_SAMPLE_ROWS)
+        self.view.resizeColumnsToContents()
+        self.leaf_check.toggled.connect(self.on_leaf_toggled)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.leaf_check)
+        layout.addWidget(self.view)
+        self.setLayout(layout)
+        self.resize(700, 500)
+
+    def on_leaf_toggled(self, checked):
+        table = self.rollup
+        self.model.set_dataframe(table[table["LEAF"]].reset_index(drop=True) if checked else table)
+
+
+class WhereUsedDialog(QDialog):
+    # 선택한 품번을 쓰는 상위 품번 (모든 단계), 더블클릭하면 Tree 에서 그 품번 행을 선택
+    def __init__(self, name, used, tree, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Where Used - %s" % name)
+        self.tree = tree
+        self.used = pd.DataFrame(used, columns=["ITM", "LEVEL"])
+
+        self.view = QTableView()
+        self.view.setModel(DataFrameTableModel(self.used, parent=self))
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.view.resizeColumnsToContents()
+        self.view.doubleClicked.connect(self.select_in_tree)
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("상위 품번 %d개" % len(self.used)))
+        layout.addWidget(self.view)
+        self.setLayout(layout)
+        self.resize(400, 400)
+
+    def select_in_tree(self, index):
+        name = self.used["ITM"].iat[index.row()]
+        self.tree.select_nodes(self.tree.model().graph.find(name))
+
+
+class TraceDialog(QDialog):
+    # 동작별 소요 시간 (bom_engine.trace) - 기록 켜기/끄기, 이름별 합계, Chrome trace JSON 저장
+    TRACE_COLUMNS = ["NAME", "THREAD", "START_MS", "MS", "ARGS"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Trace")
+
+        self.enable_check = QCheckBox("기록")
+        self.enable_check.setChecked(TRACER.enabled)
+        self.summary_check = QCheckBox("이름별 합계")
+        refresh_btn = QPushButton("새로고침")
+        clear_btn = QPushButton("지우기")
+        save_btn = QPushButton("Chrome trace 저장")
+        self.model = DataFrameTableModel(parent=self)
+        self.view = QTableView()
+        self.view.setModel(self.model)
+
+        buttons = QHBoxLayout()
+        for widget in (self.enable_check, self.summary_check, refresh_btn, clear_btn, save_btn):
+            buttons.addWidget(widget)
+        layout = QVBoxLayout()
+        layout.addLayout(buttons)
+        layout.addWidget(self.view)
+        self.setLayout(layout)
+        self.resize(800, 500)
+
+        self.enable_check.toggled.connect(self.on_enable_toggled)
+        self.summary_check.toggled.connect(self.refresh)
+        refresh_btn.clicked.connect(self.refresh)
+        clear_btn.clicked.connect(self.clear)
+        save_btn.clicked.connect(self.save)
+        self.refresh()
+
+    def on_enable_toggled(self, checked):
+        TRACER.enabled = checked
+
+    def refresh(self):
+        # 최근 기록이 위로
+        records = TRACER.records()
+        df = pd.DataFrame([(name, thread, round(start, 1), round(ms, 2), "" if not args else str(args))
+                           for name, _, start, ms, thread, args in reversed(records)], columns=self.TRACE_COLUMNS)
+        if self.summary_check.isChecked():
+            df = (df.groupby("NAME")["MS"].agg(COUNT="count", TOTAL_MS="sum", MAX_MS="max")
+                  .round(2).sort_values("TOTAL_MS", ascending=False).reset_index())
+        self.model.set_dataframe(df)
+        self.view.resizeColumnsToContents()
+
+    def clear(self):
+        TRACER.clear()
+        self.refresh()
+
+    def save(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Trace", "bom_trace.json", "Trace (*.json)")
+        if file_path:
+            TRACER.save(file_path)
+
+
 class myWindow(QWidget):
 
     def __init__(self):
@@ -301,8 +924,20 @@ class myWindow(QWidget):
         self.setWindowTitle("BOM 자동 생성기")
         # self.resize(500, 600)  # 위젯 사이즈
         
-        self.df_list = []
+        self.workbook = None    # bom_engine.loader.EcoWorkbook (ECO_BOM 시트)
+        self.cache = BomCache()
+        self.current_node = -1
+        self.eco_log = eco.EcoLog()    # 트리를 만들 때마다 새로 (첨자는 설변 한 건당 1 번만)
         self.old_names = []
+        self.worker = None      # 실행 중인 백그라운드 작업 (한 번에 하나)
+        self.worker_done = None
+        self.worker_failed = None
+        self.worker_exclusive = False   # True 면 새 작업이 이 작업을 취소하지 못함 (엑셀 저장)
+        self.worker_error = '%s'
+        self.worker_chunk = None
+        self.tree_builder = None
+        self.undo_stack = QUndoStack(self)     # 트리 편집 되돌리기 (트리를 새로 만들면 비움)
+        self.violations = None  # 엑셀을 읽을 때 검사한 입력 규칙 위반 (bom_engine.validate)
         self.updated_names = []
 
         open_btn = QPushButton('엑셀 파일 열기', self)
@@ -311,14 +946,24 @@ class myWindow(QWidget):
         self.line_edit.setFixedWidth(100) 
         
         search_button = QPushButton("Search")
+        self.search_field_combo = QComboBox()
+        self.search_field_combo.addItems(list(SEARCH_FIELDS) + ["ALL"])   # 기본: ITM (품번)
         transform_btn = QPushButton('Transform to Table', self)
           
         tree_move_up_btn = QPushButton('Move Up', self)
         tree_move_down_btn = QPushButton('Move Down', self)
         tree_del_btn = QPushButton('잘못 입력된 행 삭제', self)
+        tree_indent_btn = QPushButton('→ 하위로', self)
+        tree_outdent_btn = QPushButton('← 상위로', self)
 
         tree_add_btn = QPushButton('신규 품번 추가', self)
         remove_btn = QPushButton('삭제 품번 체크', self)      
+        self.violation_btn = QPushButton('입력 규칙 검사', self)
+        rollup_btn = QPushButton('소요량 집계', self)
+        where_used_btn = QPushButton('Where Used', self)
+        trace_btn = QPushButton('Trace', self)
+        undo_btn = QPushButton('Undo', self)
+        redo_btn = QPushButton('Redo', self)
         # color_alt_row_btn = QPushButton('설변 품번 체크', self)
         # color_row_btn = QPushButton('지울 품번 체크', self)  
 
@@ -326,11 +971,14 @@ class myWindow(QWidget):
         hbox = QHBoxLayout()
         hbox.addWidget(open_btn)
         hbox.addWidget(tree_btn)
+        hbox.addWidget(self.search_field_combo)
         hbox.addWidget(self.line_edit)
         hbox.addWidget(search_button)
         
         hbox.addWidget(tree_move_up_btn)
         hbox.addWidget(tree_move_down_btn)   
+        hbox.addWidget(tree_indent_btn)
+        hbox.addWidget(tree_outdent_btn)
         # hbox.addWidget(color_alt_row_btn)
         # hbox.addWidget(color_row_btn)  
         
@@ -338,10 +986,21 @@ class myWindow(QWidget):
 
         hbox.addWidget(tree_add_btn)
         hbox.addWidget(remove_btn)
+        hbox.addWidget(self.violation_btn)
+        hbox.addWidget(rollup_btn)
+        hbox.addWidget(where_used_btn)
+        hbox.addWidget(undo_btn)
+        hbox.addWidget(redo_btn)
+        hbox.addWidget(trace_btn)
         hbox.addWidget(transform_btn)        
                 
-        self.table = QTableWidget(self)
-        self.qtree = MyTreeWidget(self)
+        self.table = QTableView(self)
+        self.table_model = DataFrameTableModel(parent=self)
+        self.table.setModel(self.table_model)
+        self.table.horizontalHeader().setResizeContentsPrecision(RESIZE_SAMPLE_ROWS)
+        self.qtree = MyTreeView(self)
+        self.tree_model = BomTreeModel(parent=self)
+        self.qtree.setModel(self.tree_model)
 
         TableTreeBox = QHBoxLayout()
         TableTreeBox.addWidget(self.table)
@@ -379,23 +1038,62 @@ class myWindow(QWidget):
         vbox.addLayout(hbox)
         vbox.addLayout(right_hbox)
         vbox.addLayout(TableTreeBox)
+
+        # 백그라운드 작업 진행 표시
+        self.progress_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.cancel_btn = QPushButton('취소', self)
+        progress_hbox = QHBoxLayout()
+        progress_hbox.addWidget(self.progress_label)
+        progress_hbox.addWidget(self.progress_bar)
+        progress_hbox.addWidget(self.cancel_btn)
+        vbox.addLayout(progress_hbox)
+        self.hide_progress()
         
         self.setLayout(vbox)
 
         # 시그널 연결
         open_btn.clicked.connect(self.clickOpenBtn)
+        # 작업을 시작하는 버튼 (엑셀을 저장하는 동안은 꺼 둔다, set_jobs_enabled)
+        self.job_widgets = [open_btn, tree_btn, transform_btn]
+        # 트리 편집 버튼 (엑셀을 읽는 동안은 꺼 둔다, set_tree_editable)
+        self.tree_editable = True
+        self.edit_widgets = [tree_move_up_btn, tree_move_down_btn, tree_indent_btn, tree_outdent_btn, tree_del_btn,
+                             tree_add_btn, remove_btn, self.change_name_button, self.save_properties_btn]
+        self.undo_btn, self.redo_btn = undo_btn, redo_btn
+        undo_btn.clicked.connect(self.undo_stack.undo)
+        redo_btn.clicked.connect(self.undo_stack.redo)
+        self.undo_stack.canUndoChanged.connect(lambda can: undo_btn.setEnabled(can and self.tree_editable))
+        self.undo_stack.canRedoChanged.connect(lambda can: redo_btn.setEnabled(can and self.tree_editable))
+        undo_btn.setEnabled(False)
+        redo_btn.setEnabled(False)
+        self.undo_action = self.undo_stack.createUndoAction(self)
+        self.undo_action.setShortcut(QKeySequence.Undo)
+        self.redo_action = self.undo_stack.createRedoAction(self)
+        self.redo_action.setShortcut(QKeySequence.Redo)
+        self.addActions([self.undo_action, self.redo_action])
+        self.cancel_btn.clicked.connect(self.cancel_job)
         tree_btn.clicked.connect(self.clickTreeBtn)
         search_button.clicked.connect(self.on_search_button_clicked)
+        # 입력하는 대로 검색 (on_search_button_clicked 는 @traced 래퍼라 시그널 인자를 넘기지 않도록 lambda)
+        self.line_edit.textChanged.connect(lambda text: self.on_search_button_clicked())
+        self.search_field_combo.currentTextChanged.connect(lambda text: self.on_search_button_clicked())
         self.change_name_button.clicked.connect(self.on_change_name_button_clicked)
         
         tree_add_btn.clicked.connect(self.clickTreeAddBtn)
         tree_del_btn.clicked.connect(self.clickTreeDelBtn)
         tree_move_up_btn.clicked.connect(self.clickTreeMoveUpBtn)
         tree_move_down_btn.clicked.connect(self.clickTreeMoveDownBtn)
+        tree_indent_btn.clicked.connect(self.clickTreeIndentBtn)
+        tree_outdent_btn.clicked.connect(self.clickTreeOutdentBtn)
         
         # color_alt_row_btn.clicked.connect(self.clickColorAltRowBtn)
         # color_row_btn.clicked.connect(self.clickColorRowBtn)
         remove_btn.clicked.connect(self.clickRemoveBtn)
+        self.violation_btn.clicked.connect(self.show_violations)
+        rollup_btn.clicked.connect(self.show_rollup)
+        where_used_btn.clicked.connect(self.show_where_used)
+        trace_btn.clicked.connect(self.show_trace)
         transform_btn.clicked.connect(self.on_transform_button_clicked)
 
         # Change background color of buttons and input windows
@@ -411,11 +1109,17 @@ class myWindow(QWidget):
         self.save_properties_btn.setStyleSheet(change_name_color)
 
 
-    def clickTreeAddBtn(self):
-        selected_item = self.qtree.currentItem()
+    def show_alert(self, message):
+        alert = QMessageBox()
+        alert.setWindowTitle("Alert")
+        alert.setText(message)
+        alert.exec()
 
+    def clickTreeAddBtn(self):
+        graph = self.tree_model.graph
+        selected_node = self.tree_model.node(self.qtree.currentIndex())
 
-        if not selected_item:
+        if selected_node < 0 or graph.parent[selected_node] < 0:
             self.show_alert('품번을 추가할 Class(Parent)를 선택하세요') #김영진_알람메시지
             return
 
@@ -424,68 +1128,131 @@ class myWindow(QWidget):
 
         if result == QDialog.Accepted:
             new_item_data = dialog.get_row_data()
-            new_item = QTreeWidgetItem(new_item_data)
 
-            # Set the background color of the new item to yellow
-            yellow_background = QColor(255, 255, 0)
-            for i in range(new_item.columnCount()):
-                new_item.setBackground(i, yellow_background)
-
-            selected_item.parent().insertChild(selected_item.parent().indexOfChild(selected_item) + 1, new_item)
-
-
-        new_item_data = ['', '', '', '', '']
-        new_item = QTreeWidgetItem(new_item_data)
-        # selected_item.addChild(new_item)
+            # 선택한 품번 바로 아래에 노란색(추가)으로 삽입 (입력 창을 띄운 시간은 빼고 기록)
+            with span('myWindow.clickTreeAddBtn'):
+                self.undo_stack.push(InsertNodeCommand(self.tree_model, graph.parent[selected_node],
+                                                       graph.row[selected_node] + 1, new_item_data, STATUS_ADDED))
 
+    @traced()
     def clickTreeDelBtn(self):
-        selected_items = self.qtree.selectedItems()
+        graph = self.tree_model.graph
+        selected_nodes = self.selected_nodes()
 
-        if not selected_items:
+        if not selected_nodes:
             self.show_alert('삭제할 품번을 선택하세요')
             return
         
-        for item in selected_items:
-            item.parent().removeChild(item)
-
+        # 같은 상위의 연속된 행끼리 묶어 한 번에 삭제 (아래 묶음부터, 앞 묶음 위치가 바뀌지 않도록)
+        # 여러 묶음도 명령 하나로 되돌린다
+        self.qtree.selectionModel().clearSelection()
+        runs = []
+        for nid in sorted(selected_nodes, key=lambda n: (graph.parent[n], graph.row[n])):
+            parent, row = graph.parent[nid], graph.row[nid]
+            if runs and runs[-1][0] == parent and runs[-1][1] + runs[-1][2] == row:
+                runs[-1][2] += 1
+            else:
+                runs.append([parent, row, 1])
+        command = RemoveRowsCommand(self.tree_model, list(reversed(runs)))
+        command.setText('행 삭제 %d개' % len(selected_nodes))
+        self.undo_stack.push(command)
+        if self.current_node >= 0 and not graph.attached(self.current_node):
+            self.clear_item_properties()
+
+    @traced()
     def clickTreeMoveUpBtn(self):
-        selected_item = self.qtree.currentItem()
-        if not selected_item or not selected_item.parent():
-            return
-
-        parent = selected_item.parent()
-        index = parent.indexOfChild(selected_item)
-        if index == 0:
-            return
-
-        parent.removeChild(selected_item)
-        parent.insertChild(index - 1, selected_item)
-        self.qtree.setCurrentItem(selected_item)
+        self.move_selected_rows(-1)
 
+    @traced()
     def clickTreeMoveDownBtn(self):
-        selected_item = self.qtree.currentItem()
-        if not selected_item or not selected_item.parent():
-            return
+        self.move_selected_rows(1)
 
-        parent = selected_item.parent()
-        index = parent.indexOfChild(selected_item)
-        if index == parent.childCount() - 1:
+    @traced()
+    def clickTreeIndentBtn(self):
+        # 선택한 행을 바로 위 형제 품번의 하위(맨 아래)로
+        block = self.selected_block()
+        if block is None:
             return
+        parent, first, count = block
+        if first == 0:
+            return
+        new_parent = self.tree_model.graph.siblings(parent)[first - 1]
+        self.reparent_rows(parent, first, count, new_parent, len(self.tree_model.graph.children[new_parent]))
+
+    @traced()
+    def clickTreeOutdentBtn(self):
+        # 선택한 행을 상위 품번 바로 다음 위치로 (최상위 PARENT 바로 아래 행은 그대로)
+        graph = self.tree_model.graph
+        block = self.selected_block()
+        if block is None:
+            return
+        parent, first, count = block
+        if graph.parent[parent] < 0:
+            return
+        self.reparent_rows(parent, first, count, graph.parent[parent], graph.row[parent] + 1)
 
-        parent.removeChild(selected_item)
-        parent.insertChild(index + 1, selected_item)
-        self.qtree.setCurrentItem(selected_item)
-
+    def move_selected_rows(self, offset):
+        # 선택한 형제 묶음을 offset 만큼 옮긴다 (끝을 넘으면 끝까지)
+        block = self.selected_block()
+        if block is None:
+            return
+        parent, first, count = block
+        pos = max(0, min(first + offset, len(self.tree_model.graph.siblings(parent)) - count))
+        if pos == first:
+            return
+        self.undo_stack.push(MoveRowsCommand(self.tree_model, parent, first, count, pos))
+        self.select_rows(parent, pos, count)
+
+    def reparent_rows(self, old_parent, first, count, parent, pos):
+        graph = self.tree_model.graph
+        try:
+            for nid in graph.siblings(old_parent)[first:first + count]:
+                graph.check_reparent(nid, parent)
+        except BomCycleError as e:
+            self.show_alert(str(e))
+            return
+        self.undo_stack.push(ReparentRowsCommand(self.tree_model, old_parent, first, count, parent, pos))
+        self.qtree.expand(self.tree_model.index_of(parent))
+        self.select_rows(parent, pos, count)
+
+    def selected_nodes(self):
+        # 선택한 행 (최상위 PARENT 행, 상위 행이 같이 선택된 하위 행은 제외)
+        graph = self.tree_model.graph
+        nodes = [self.tree_model.node(index) for index in self.qtree.selectionModel().selectedRows()]
+        chosen = set(nodes)
+        return [nid for nid in nodes
+                if graph.parent[nid] >= 0 and not any(node in chosen for node in graph.ancestors(nid))]
+
+    def selected_block(self):
+        # 선택한 행이 같은 상위 아래 연속된 행이면 (parent, first, count), 선택이 없으면 현재 행
+        graph = self.tree_model.graph
+        nodes = self.selected_nodes()
+        if not nodes:
+            nid = self.tree_model.node(self.qtree.currentIndex())
+            if nid < 0 or graph.parent[nid] < 0:
+                return None
+            nodes = [nid]
+        parent = graph.parent[nodes[0]]
+        rows = sorted(graph.row[nid] for nid in nodes)
+        if any(graph.parent[nid] != parent for nid in nodes) or rows[-1] - rows[0] + 1 != len(rows):
+            self.show_alert('같은 상위 품번 아래의 연속된 행을 선택하세요')
+            return None
+        return parent, rows[0], len(rows)
+
+    def select_rows(self, parent, first, count):
+        model = self.tree_model
+        sibs = model.graph.siblings(parent)
+        top = model.index_of(sibs[first])
+        sel = self.qtree.selectionModel()
+        sel.setCurrentIndex(top, QItemSelectionModel.NoUpdate)
+        sel.select(QItemSelection(top, model.index_of(sibs[first + count - 1], model.columnCount() - 1)),
+                   QItemSelectionModel.ClearAndSelect)
+
+    @traced()
     def clickRemoveBtn(self):
-        selected_items = self.qtree.selectedItems()
-        gray_background = QColor(192, 192, 192)
-
-        for item in selected_items:
-            for i in range(item.columnCount()):
-                item.setBackground(i, gray_background)
-            
-            # 추가 
-            item.setData(0, Qt.UserRole, "deleted")
+        nodes = [self.tree_model.node(index) for index in self.qtree.selectionModel().selectedRows()]
+        if nodes:
+            self.undo_stack.push(SetStatusCommand(self.tree_model, nodes, STATUS_DELETED))
 
 
     # def clickColorRowBtn(self):
@@ -505,25 +1272,28 @@ class myWindow(QWidget):
     #         for i in range(item.columnCount()):
     #             item.setBackground(i, sky_blue_background)
                 
+    @traced()
     def on_transform_button_clicked(self):
-        df = tree_to_dataframe(self.qtree)
-        self.df_list.append(df)
-        old_df = self.df_list[2]
-        new_df = self.df_list[3]
-        # self.show_dataframe_on_table(self.df_list[-1])
-        self.show_dataframe_in_popup(old_df, new_df) 
+        if self.workbook is None:
+            return
+        # 트리 -> DataFrame 은 GUI 스레드에서 (트리 편집과 겹치지 않도록), 비교는 작업 스레드에서
+        new_df = tree_to_dataframe(self.tree_model.graph)
+        old_df = self.workbook.eco_bom
+        self.run_job('BOM 비교 중...', lambda worker: DataFrameDialog.compare(old_df, new_df),
+                     lambda comparison: self.on_bom_compared(new_df, comparison))
 
-        for column in new_df.columns:
-            new_df[column] = new_df[column].apply(lambda x: x['text'] if isinstance(x, dict) and 'text' in x else x)
+    def on_bom_compared(self, new_df, comparison):
+        self.show_dataframe_in_popup(comparison)
 
-        self.save_dataframe_to_excel(new_df)    # 엑셀 신규 bom 만 저장 
+        self.save_dataframe_to_excel(new_df)    # 엑셀 신규 bom 만 저장 (STATUS 는 행 색으로)
         
         NamesInformer = ItemNameInformer(self.old_names, self.updated_names)
         NamesInformer.exec()
 
-    def show_dataframe_in_popup(self, old_df, new_df):
+    def show_dataframe_in_popup(self, comparison):
         dialog = DataFrameDialog(self)
-        dialog.show_dataframes(old_df, new_df)
+        dialog.show_comparison(comparison)
+        dialog.sync_table_scrollbars()
         dialog.setGeometry(100, 100, 1200, 800)
         dialog.exec()
 
@@ -536,84 +1306,39 @@ class myWindow(QWidget):
     #         for j in range(df.shape[1]):
     #             self.table.setItem(i, j, QTableWidgetItem(str(df.iat[i, j])))
 
-    def load_item_properties(self, item):
+    def load_item_properties(self, index):
+        nid = self.tree_model.node(index)
         for i in range(len(self.property_labels)):
-            self.property_lineedits[i].setText(item.text(i))
-        self.current_item = item
+            self.property_lineedits[i].setText(self.tree_model.graph.value(nid, i))
+        self.current_node = nid
 
-    def save_item_properties(self):
-        for i in range(len(self.property_labels)):
-            self.current_item.setText(i, self.property_lineedits[i].text())
-
-
-    def increment_last_alpha(self, s):
-        last_alpha = s[-1]
-        if last_alpha in string.ascii_uppercase:
-            index = string.ascii_uppercase.index(last_alpha)
-            if index + 1 < len(string.ascii_uppercase):
-                if index == 7 or index == 14:
-                    s = s[:-1] + string.ascii_uppercase[index + 2]
-                else:
-                    s = s[:-1] + string.ascii_uppercase[index + 1]
-            else:
-                self.show_alert('Z 이상의 첨자 품번을 생성할 수 없습니다.')
-        # This part of the code checks if the last character of a string is a digit
-        elif last_alpha.isdigit():
-        # If it is a digit, then 'A' is added to the end of the string
-            s += 'A'     
-                                
-        return s
-
-    def find_nodes_by_name(self, parent_item, name):
-        result = []
-
-        if parent_item is None:
-            parent_item = self.qtree.invisibleRootItem()
-
-        for i in range(parent_item.childCount()):
-            child_item = parent_item.child(i)
-            if child_item.text(0) == name:
-                result.append(child_item)
-            result.extend(self.find_nodes_by_name(child_item, name))
-
-        return result
-        
+    def clear_item_properties(self):
+        # 속성 창이 가리키던 노드가 없어짐 (트리 교체, 행 삭제)
+        self.current_node = -1
+        for lineedit in self.property_lineedits:
+            lineedit.clear()
 
-    def change_node_name(self, old_name, new_name):
-        # Find all items by old_name
-        items = self.find_nodes_by_name(None, old_name)
-
-        for item in items:
-            # Update the item's name
-            item.setText(0, new_name)
-
-            # Change the background color to red
-            self.qtree.set_item_background_color(item, QtGui.QColor("red"))
-
-            # Change parent node names and background color
-            self.old_names.append(old_name)
-            self.updated_names.append(new_name)
-            self.change_node_and_ancestors(item.parent())
-                    
-    def change_node_and_ancestors(self, item):
-        if item is None:
+    @traced()
+    def save_item_properties(self):
+        # 되돌리기로 삽입이 취소된 노드처럼 트리에서 떨어진 노드는 저장하지 않는다
+        if self.current_node < 0 or not self.tree_model.graph.attached(self.current_node):
+            self.clear_item_properties()
             return
+        command = SetValuesCommand(self.tree_model, self.current_node,
+                                   [lineedit.text() for lineedit in self.property_lineedits])
+        if command.changes:
+            self.undo_stack.push(command)
 
-        # Change the node name
-        old_name = item.text(0)
-        new_name = self.increment_last_alpha(old_name)
-        self.old_names.append(old_name)
-        self.updated_names.append(new_name)
-
-        # Update the item's name
-        if ('620203-' not in old_name) and ('620205-' not in old_name):
-            item.setText(0, new_name)
-        
-        # Change the background color to red
-        self.qtree.set_item_background_color(item, QtGui.QColor("red"))
 
-        # Move to the next parent
-        self.change_node_and_ancestors(item.parent())  
+    @traced()
+    def change_node_name(self, old_name, new_name):
+        # 품번 변경 + 상위 품번 첨자 변경은 엔진에서 처리
+        log = self.eco_log
+        errors = len(log.errors)
+        self.undo_stack.push(RenameCommand(self.tree_model, log, old_name, new_name,
+                                           (self.old_names, self.updated_names)))
+        for message in log.errors[errors:]:
+            self.show_alert(message)
 
     
     # def update_tree(self):
@@ -622,105 +1347,159 @@ class myWindow(QWidget):
 
     # def update_table(self):
     #     self.table.clear()
-    #     self.initTableWidget(2)  
+    #     self.initTableWidget(self.workbook.eco_bom)
 
     def on_change_name_button_clicked(self):
         old_name = self.old_name_edit.text()
         new_name = self.new_name_edit.text()
         self.change_node_name(old_name, new_name)
     
+    @traced()
     def clickOpenBtn(self):
+        if self.exclusive_job_running():
+            return
         file_path, ext = QFileDialog.getOpenFileName(self, '파일 열기', os.getcwd(), 'excel file (*.xls *.xlsx)')
         if file_path:
-            self.df_list = self.loadData(file_path)
-            self.initTableWidget(id=2)
+            # 읽는 대로 청크 단위로 테이블과 트리에 붙인다
+            # BomBuilder 가 노드를 붙이는 동안 트리를 편집하면 노드가 떨어져 나가므로 다 읽을 때까지 편집 금지
+            self.drop_job()
+            self.workbook = None
+            self.set_violations(None)
+            self.table_model.set_dataframe(pd.DataFrame())
+            self.set_tree_graph(BomGraph())
+            self.tree_builder = BomBuilder(self.tree_model.graph)
+            self.set_tree_editable(False)
+            self.run_job('엑셀 파일 읽는 중...', lambda worker: self.loadData(file_path, worker.emit_chunk),
+                         self.on_workbook_loaded, 'File read error: %s', self.on_chunk_loaded,
+                         self.on_load_failed)
+
+    @traced()
+    def on_chunk_loaded(self, df):
+        first = self.table_model.rowCount() == 0
+        self.table_model.append_dataframe(df)
+        self.tree_model.append_rows(self.tree_builder, df)
+        if first:
+            self.table.resizeColumnsToContents()
+            self.qtree.expandToDepth(0)     # 최상위 ASSY 부터 보여준다
+            self.qtree.fit_columns()
+        self.progress_label.setText('엑셀 파일 읽는 중... %d 행' % self.table_model.rowCount())
+
+    @traced()
+    def on_workbook_loaded(self, workbook):
+        self.workbook = workbook
+        self.table_model.replace_dataframe(workbook.eco_bom)
+        self.set_violations(validate_bom(workbook.eco_bom))
+        self.set_tree_editable(True)
+        try:
+            self.tree_builder.finish()
+        except BomCycleError as e:
+            self.set_tree_graph(BomGraph())
+            self.show_alert(str(e))
+            return
+        self.expand_tree()
+
+    def on_load_failed(self, cancelled):
+        # 읽다가 실패하거나 취소됨: 그때까지 읽은 트리는 그대로 두고 편집만 다시 허용
+        self.set_tree_editable(True)
+
+    def set_tree_graph(self, graph):
+        # 트리를 바꾸면 이전 트리의 노드를 가리키는 되돌리기 기록, 설변 기록, 속성 창 노드는 버린다
+        self.tree_model.set_graph(graph)
+        self.undo_stack.clear()
+        self.eco_log = eco.EcoLog()
+        self.clear_item_properties()
+
+    def set_tree_editable(self, editable):
+        self.tree_editable = editable
+        for widget in self.edit_widgets:
+            widget.setEnabled(editable)
+        self.undo_btn.setEnabled(editable and self.undo_stack.canUndo())
+        self.redo_btn.setEnabled(editable and self.undo_stack.canRedo())
+        self.undo_action.setEnabled(editable and self.undo_stack.canUndo())
+        self.redo_action.setEnabled(editable and self.undo_stack.canRedo())
                        
 
+    def set_violations(self, violations):
+        # 위반 행은 테이블에서 주황색으로 표시
+        self.violations = violations
+        if violations is None or violations.empty:
+            self.violation_btn.setText('입력 규칙 검사')
+            self.table_model.set_row_colors(None)
+            return
+        self.violation_btn.setText('입력 규칙 위반 %d건' % len(violations))
+        mask = violation_mask(violations, self.table_model.rowCount())
+        self.table_model.set_row_colors([VIOLATION_COLOR if bad else None for bad in mask.tolist()])
+
+    def show_violations(self):
+        if self.violations is None:
+            return
+        if self.violations.empty:
+            self.show_alert('입력 규칙 위반이 없습니다.')
+            return
+        ViolationDialog(self.violations, self.table, self).show()
+
+    @traced()
+    def show_rollup(self):
+        # 현재 트리(편집 내용 포함) 기준, 삭제 표시한 품번은 빠진다
+        if len(self.tree_model.graph) == 0:
+            self.show_alert('Tree를 먼저 만드세요')
+            return
+        try:
+            table = rollup_table(self.tree_model.graph)
+        except BomCycleError as e:
+            self.show_alert(str(e))
+            return
+        RollupDialog(table, self).show()
+
+    @traced()
+    def show_where_used(self):
+        # 현재 행 품번의 상위 품번 (트리를 훑지 않고 where-used 색인에서)
+        nid = self.tree_model.node(self.qtree.currentIndex())
+        if nid < 0:
+            self.show_alert('품번을 선택하세요')
+            return
+        name = self.tree_model.graph.value(nid, 0)
+        WhereUsedDialog(name, self.tree_model.where_used.where_used(name), self.qtree, self).show()
+
+    def show_trace(self):
+        TraceDialog(self).show()
+
+    @traced()
     def on_search_button_clicked(self):
         text = self.line_edit.text()
-        self.qtree.selectionModel().clear()
-        self.qtree.do_search(text)
+        field = self.search_field_combo.currentText()
+        self.qtree.do_search(text, None if field == "ALL" else [field])
   
+    @traced()
     def clickTreeBtn(self):
-        TreeWidget = self.qtree
-        
-        TreeWidget.setColumnCount(5)
-        TreeWidget.setHeaderLabels(["CLASS", "PREFIX", "ITM_DESC", "QTY", "UOM", "SRC", "PROC", "THREAD"] )
-        TreeWidget.setAlternatingRowColors(True)
-        TreeWidget.header().setSectionResizeMode(QHeaderView.Interactive)
-        
-        # Use the new create_tree function instead of anytree
-        self.create_tree(self.df_list[2], TreeWidget)
-
-        TreeWidget.expandAll()
-
-        TreeWidget.resizeColumnToContents(0)
-        TreeWidget.resizeColumnToContents(1)
-        TreeWidget.resizeColumnToContents(2)
-        TreeWidget.resizeColumnToContents(3)
-        TreeWidget.resizeColumnToContents(4)
-
-    def create_tree(self, df, tree_widget):
-        parent_dict = {}
+        # 모델만 만들고 뷰는 보이는 행만 요청
+        if self.workbook is None:
+            return
+        df = self.workbook.eco_bom
+        # BomGraph 는 Qt 와 무관하므로 작업 스레드에서 만들고, 모델 교체만 GUI 스레드에서 (BomCycleError 는 알림 창)
+        self.run_job('Tree 만드는 중...', lambda worker: self.create_tree(df), self.on_tree_built)
 
-        for index, row in df.iterrows():
-            itm = row['ITM']
-            parent_itm = row['PARENT']
+    @traced()
+    def on_tree_built(self, graph):
+        self.set_tree_graph(graph)
+        self.expand_tree()
 
-            itm_data = [itm, row['PREFIX'], row['ITM_DESC'], str(row['QTY']),
-                        row['UOM'], row['SRC'], row['PROC'], row['THREAD']]
+    def expand_tree(self):
+        if len(self.tree_model.graph) <= TREE_EXPAND_ALL_LIMIT:
+            self.qtree.expandAll()
+        else:
+            self.qtree.expandToDepth(1)
 
-            if parent_itm not in parent_dict:
-                parent_dict[parent_itm] = QTreeWidgetItem(tree_widget, [parent_itm])
+        self.qtree.fit_columns()
 
-            itm_item = QTreeWidgetItem(parent_dict[parent_itm], itm_data)
-            parent_dict[itm] = itm_item  
+    def create_tree(self, df):
+        return BomGraph.from_dataframe(df)
             
-    def loadData(self, file_name):
-        df_list = []        
-        with pd.ExcelFile(file_name) as wb:            
-            for i, sn in enumerate(wb.sheet_names):              
-                try:
-                    df = pd.read_excel(wb, sheet_name=sn)
-                    if sn == "ECO_BOM": #ECO_BOM시트만 OLD BOM정리
-                        df= df.iloc[3:,:11]
-                        df.replace('\n','', regex=True, inplace=True)
-                        df= df.rename(columns = df.iloc[0])
-                        df= df.drop(df.index[0])
-                        df.dropna(axis=0, how='all', inplace=True)
-                        df= df
-                        df= df.reset_index(drop=True)
-                        
-                except Exception as e:
-                    print('File read error:', e)
-                else:
-                    df = df.fillna(0)
-                    df.name = sn
-                    df_list.append(df)
-        return df_list
+    def loadData(self, file_name, on_chunk=None):
+        # ECO_BOM 시트만 읽는다
+        # 한 번 열었던 파일은 캐시에서 바로 읽음, on_chunk 가 있으면 읽는 대로 청크를 넘김
+        return EcoWorkbook(file_name, cache=self.cache, on_chunk=on_chunk)
         
-    def initTableWidget(self, id):
-        # 테이블 위젯 값 쓰기
-        self.table.clear()
-        # select dataframe
-        df = self.df_list[id]; 
-
-        # table write        
-        col = len(df.keys())
-        self.table.setColumnCount(col)
-        self.table.setHorizontalHeaderLabels(df.keys())
- 
-        row = len(df.index)
-        self.table.setRowCount(row)
-        self.writeTableWidget(df, row, col)
-
-    def writeTableWidget(self, df, row, col):
-        
-        for r in range(row): 
-            for c in range(col):
-                item = QTableWidgetItem(str(df.iloc[r][c]))
-                self.table.setItem(r, c, item) 
-        self.table.resizeColumnsToContents()
 
 
 
@@ -731,7 +1510,98 @@ class myWindow(QWidget):
         file_path, _ = QFileDialog.getSaveFileName(self, "Save Excel File", "",
                                                    "Excel Files (*.xlsx);;All Files (*)", options=options)
         if file_path:
-            df.to_excel(file_path, index=False)
+            # 저장 중에는 다른 작업을 시작하지 못하게 한다 (취소되면 쓰던 파일이 지워지므로)
+            def job(worker):
+                return write_bom_xlsx(df, file_path, cancel=lambda: worker.cancelled,
+                                      progress=lambda done, total: worker.report('엑셀 저장 중...', 100 * done // max(total, 1)))
+
+            def on_failed(cancelled):
+                self.set_jobs_enabled(True)
+                if cancelled:
+                    self.show_alert('엑셀 저장을 취소했습니다. 쓰던 파일은 지웁니다: %s' % file_path)
+
+            self.set_jobs_enabled(False)
+            self.run_job('엑셀 저장 중...', job, lambda saved: self.set_jobs_enabled(True), 'File save error: %s',
+                         on_failed=on_failed, exclusive=True)
+
+    def set_jobs_enabled(self, enabled):
+        for widget in self.job_widgets:
+            widget.setEnabled(enabled)
+
+    def run_job(self, message, job, on_done, error_format='%s', on_chunk=None, on_failed=None, exclusive=False):
+        # job(worker) 를 스레드 풀에서 실행하고 끝나면 GUI 스레드에서 on_done(결과)
+        # worker.emit_chunk(data) 로 보낸 중간 결과는 GUI 스레드에서 on_chunk(data)
+        # 실패하면 (알림 창을 띄운 뒤) on_failed(False), 취소되면 on_failed(True)
+        # 새 작업을 시작하면 이전 작업은 취소 (결과를 쓰지 않음). 단 exclusive 작업이 돌고 있으면 새 작업을 거절
+        if self.exclusive_job_running():
+            return
+        self.drop_job()
+        worker = Worker(job, message)
+        worker.signals.progress.connect(self.show_progress)
+        worker.signals.chunk.connect(self.on_job_chunk)
+        worker.signals.finished.connect(self.on_job_finished)
+        worker.signals.failed.connect(self.on_job_failed)
+        self.worker, self.worker_done, self.worker_error = worker, on_done, error_format
+        self.worker_chunk, self.worker_failed, self.worker_exclusive = on_chunk, on_failed, exclusive
+        self.show_progress(-1, message)
+        QThreadPool.globalInstance().start(worker)
+
+    def on_job_chunk(self, worker, data):
+        if worker is self.worker and self.worker_chunk is not None:
+            self.worker_chunk(data)
+
+    def on_job_finished(self, worker, result):
+        if worker is not self.worker:
+            return
+        on_done = self.worker_done
+        self.worker = self.worker_done = self.worker_failed = None
+        self.hide_progress()
+        on_done(result)
+
+    def on_job_failed(self, worker, error):
+        if worker is not self.worker:
+            return
+        on_failed = self.worker_failed
+        self.worker = self.worker_done = self.worker_failed = None
+        self.hide_progress()
+        self.show_alert(self.worker_error % error)
+        if on_failed is not None:
+            on_failed(False)
+
+    def exclusive_job_running(self):
+        # 취소하면 안 되는 작업(엑셀 저장)이 도는 중이면 알리고 True
+        if self.worker is not None and self.worker_exclusive:
+            self.show_alert('진행 중인 작업(%s)이 끝난 뒤 다시 시도하세요.' % self.worker.name)
+            return True
+        return False
+
+    def drop_job(self):
+        # 실행 중인 작업을 취소하고 (결과는 쓰지 않음) on_failed(True) 를 부른다
+        if self.worker is None:
+            return
+        on_failed = self.worker_failed
+        self.worker.cancel()
+        self.worker = self.worker_done = self.worker_failed = None
+        if on_failed is not None:
+            on_failed(True)
+
+    def cancel_job(self):
+        self.drop_job()
+        self.hide_progress()
+
+    def show_progress(self, percent, message):
+        if percent < 0:
+            self.progress_bar.setRange(0, 0)    # 진행률을 모를 때는 움직이는 막대
+        else:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(percent)
+        self.progress_label.setText(message)
+        for widget in (self.progress_label, self.progress_bar, self.cancel_btn):
+            widget.show()
+
+    def hide_progress(self):
+        for widget in (self.progress_label, self.progress_bar, self.cancel_btn):
+            widget.hide()
 
     
 # class DeveloperInfo(QWidget):